@@ -1,5 +1,15 @@
 // Pompom Tama — Service Worker (offline cache)
-const CACHE_NAME = 'pompom-v2';
+const CACHE_NAME = 'pompom-v3';
+// Sprite assets live in their own cache, checked by content hash against
+// precache-manifest.json (written by scripts/precache_manifest.py), so a new
+// deploy only re-downloads the files that actually changed.
+const ASSET_CACHE = 'pompom-assets';
+const ASSET_MANIFEST = './precache-manifest.json';
+const ASSET_HASHES = './__asset-hashes';
+// Version of precache-manifest.json, stamped here by precache_manifest.py so
+// that every deploy which changes a sprite also changes this file: the browser
+// then installs a new worker and activate re-syncs the cache-first assets.
+const ASSET_VERSION = 'c64c68bff922d540';
 
 const PRECACHE_URLS = [
     './',
@@ -8,39 +18,101 @@ const PRECACHE_URLS = [
     './icons/icon-512.png',
 ];
 
-// Install: pre-cache shell
+function absolute(url) {
+    return new URL(url, self.registration.scope).href;
+}
+
+async function readHashes(cache) {
+    const stored = await cache.match(absolute(ASSET_HASHES));
+    return stored ? stored.json() : {};
+}
+
+// Fetch every manifest asset (or only the critical ones) whose cached copy
+// is missing or was stored under another hash.
+async function syncAssets({ criticalOnly }) {
+    const response = await fetch(`${absolute(ASSET_MANIFEST)}?v=${ASSET_VERSION}`, { cache: 'no-cache' });
+    if (!response.ok) return;
+    const manifest = await response.json();
+    const cache = await caches.open(ASSET_CACHE);
+    const hashes = await readHashes(cache);
+
+    const wanted = manifest.assets.filter((asset) => asset.critical || !criticalOnly);
+    await Promise.all(wanted.map(async (asset) => {
+        const url = absolute(asset.url);
+        if (hashes[url] === asset.hash && await cache.match(url)) return;
+        const fresh = await fetch(url, { cache: 'no-cache' });
+        if (fresh.ok) {
+            await cache.put(url, fresh);
+            hashes[url] = asset.hash;
+        }
+    }));
+
+    if (!criticalOnly) {
+        // Drop assets the current deploy no longer lists.
+        const listed = new Set(manifest.assets.map((asset) => absolute(asset.url)));
+        for (const url of Object.keys(hashes)) {
+            if (!listed.has(url)) {
+                await cache.delete(url);
+                delete hashes[url];
+            }
+        }
+    }
+    await cache.put(absolute(ASSET_HASHES), new Response(JSON.stringify(hashes)));
+    assetUrls = null;
+}
+
+let assetUrls = null;
+function cachedAssetUrls() {
+    if (!assetUrls) {
+        assetUrls = caches.open(ASSET_CACHE).then(readHashes).then((hashes) => new Set(Object.keys(hashes)));
+    }
+    return assetUrls;
+}
+
+// Install: pre-cache shell and the sprites needed for the first frame
 self.addEventListener('install', (event) => {
-    event.waitUntil(
-        caches.open(CACHE_NAME).then((cache) => cache.addAll(PRECACHE_URLS))
-    );
+    event.waitUntil(Promise.all([
+        caches.open(CACHE_NAME).then((cache) => cache.addAll(PRECACHE_URLS)),
+        syncAssets({ criticalOnly: true }).catch(() => {}),
+    ]));
     self.skipWaiting();
 });
 
-// Activate: clean old caches
+// Activate: clean old caches, then bring the rest of the sprites up to date
 self.addEventListener('activate', (event) => {
     event.waitUntil(
         caches.keys().then((keys) =>
-            Promise.all(keys.filter((k) => k !== CACHE_NAME).map((k) => caches.delete(k)))
-        )
+            Promise.all(keys.filter((k) => k !== CACHE_NAME && k !== ASSET_CACHE).map((k) => caches.delete(k)))
+        ).then(() => syncAssets({ criticalOnly: false }).catch(() => {}))
     );
     self.clients.claim();
 });
 
-// Fetch: network-first, fallback to cache
+function networkFirst(request) {
+    return fetch(request)
+        .then((response) => {
+            if (response.ok) {
+                const clone = response.clone();
+                caches.open(CACHE_NAME).then((cache) => cache.put(request, clone));
+            }
+            return response;
+        })
+        .catch(() => caches.match(request));
+}
+
+// Fetch: hashed sprite assets are served from cache (they are revalidated by
+// hash on activate); everything else is network-first, fallback to cache.
 // En la primera visita todos los assets quedan cacheados automáticamente.
 self.addEventListener('fetch', (event) => {
     // Solo cachear requests GET del mismo origen
     if (event.request.method !== 'GET') return;
 
     event.respondWith(
-        fetch(event.request)
-            .then((response) => {
-                if (response.ok) {
-                    const clone = response.clone();
-                    caches.open(CACHE_NAME).then((cache) => cache.put(event.request, clone));
-                }
-                return response;
-            })
-            .catch(() => caches.match(event.request))
+        cachedAssetUrls().then((urls) => {
+            if (!urls.has(event.request.url)) return networkFirst(event.request);
+            return caches.open(ASSET_CACHE)
+                .then((cache) => cache.match(event.request.url))
+                .then((cached) => cached || networkFirst(event.request));
+        })
     );
 });
@@ -125,7 +125,8 @@ export function startGameLoop(canvas: HTMLCanvasElement, petLinePreference?: Pet
     import('./renderer/UIRenderer'),
     import('./renderer/SpriteConfigs'),
     import('./assets/PlaceholderIcons'),
-  ]).then(([modSprite, modUI, modConfig, modIcons]) => {
+    import('./renderer/spriteVariants'),
+  ]).then(([modSprite, modUI, modConfig, modIcons, modVariants]) => {
     const { AssetManager, SpriteRenderer: SR } = modSprite;
     const { UIRenderer } = modUI;
     const { loadPlaceholders } = modIcons;
@@ -141,8 +142,17 @@ export function startGameLoop(canvas: HTMLCanvasElement, petLinePreference?: Pet
       return loadPlaceholders(assetManager);
     }).then(() => {
       const promises = [];
+      // The pet's whole line loads now so an evolution has its strip ready.
+      const eager = new Set([petState.species, ...(modConfig.LINE_SPRITES[petState.petLine] ?? [])]);
       for (const key in spriteConfigs) {
-        promises.push(assetManager.load(key, (spriteConfigs as any)[key].src));
+        const src = (spriteConfigs as any)[key].src;
+        // Other lines' strips with scaled variants load on first use:
+        // minigames that draw them small pick a variant and never need the 1x image.
+        if (!eager.has(key) && modVariants.hasVariants(src)) {
+          assetManager.register(key, src);
+          continue;
+        }
+        promises.push(assetManager.load(key, src));
       }
       // Load album demo
       promises.push(assetManager.load('album_moments_demo', `${import.meta.env.BASE_URL}assets/album_moments_demo.png`));
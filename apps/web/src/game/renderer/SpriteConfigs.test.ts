@@ -1,8 +1,13 @@
 import { describe, expect, it } from 'vitest';
 import { readFileSync, existsSync } from 'node:fs';
 import { join } from 'node:path';
-import { SPRITE_CONFIGS } from './SpriteConfigs';
+import { LINE_SPRITES, SPRITE_CONFIGS, atlasSpriteConfig } from './SpriteConfigs';
+import type { SpriteAtlasMap } from './SpriteConfigs';
+import hashedAssets from './hashedAssets.json';
+import spriteVariants from './spriteVariants.json';
+import trimmedFrames from './trimmedFrames.json';
 import { ICON_MAP } from '../assets/PlaceholderIcons';
+import { hasVariants } from './spriteVariants';
 
 function imageSize(filePath: string): { width: number; height: number } {
   const data = readFileSync(filePath);
@@ -81,6 +86,16 @@ describe('Sprite wiring', () => {
       expect(existsSync(full)).toBe(true);
 
       const { width, height } = imageSize(full);
+      const rects = cfg.animations.idle.frameRects;
+      if (rects) {
+        // Trimmed strip: every frame rect must lie inside the image.
+        expect(rects.length).toBe(cfg.animations.idle.frames);
+        for (const r of rects) {
+          expect(r.x + r.w).toBeLessThanOrEqual(width);
+          expect(r.y + r.h).toBeLessThanOrEqual(height);
+        }
+        continue;
+      }
       expect(height % cfg.gridSize).toBe(0);
       expect(height / cfg.gridSize).toBeGreaterThanOrEqual(1);
       expect(width % cfg.gridSize).toBe(0);
@@ -109,4 +124,63 @@ describe('Sprite wiring', () => {
       expect(existsSync(toPublicPath(url))).toBe(true);
     }
   });
+
+  it('loads hashed strip copies when the asset map lists them', () => {
+    for (const [key, path] of Object.entries(hashedAssets as Record<string, string>)) {
+      expect(existsSync(toPublicPath(path))).toBe(true);
+      expect(SPRITE_CONFIGS[key].src.endsWith(path)).toBe(true);
+    }
+  });
+
+  it('draws trimmed strips through their frame rects', () => {
+    for (const [key, rects] of Object.entries(trimmedFrames as Record<string, unknown[]>)) {
+      if (!SPRITE_CONFIGS[key]) continue;
+      expect(SPRITE_CONFIGS[key].animations.walk.frameRects).toEqual(rects);
+    }
+  });
+
+  it('lists only sprite variants that exist', () => {
+    for (const variants of Object.values(spriteVariants as Record<string, { src: string }[]>)) {
+      for (const variant of variants) {
+        expect(existsSync(toPublicPath(variant.src))).toBe(true);
+      }
+    }
+  });
+
+  it('finds the variants of hashed strip copies', () => {
+    for (const [key, path] of Object.entries(hashedAssets as Record<string, string>)) {
+      const stable = path.replace(/\.[0-9a-f]{10}(\.\w+)$/, '$1');
+      if ((spriteVariants as Record<string, unknown>)[stable]) {
+        expect(hasVariants(SPRITE_CONFIGS[key].src)).toBe(true);
+      }
+    }
+  });
+
+  it('assigns every species strip to exactly one pet line', () => {
+    const listed = Object.values(LINE_SPRITES).flat();
+    expect([...listed].sort()).toEqual(Object.keys(SPRITE_CONFIGS).sort());
+  });
+
+  it('builds frame-rect configs from an atlas frame map', () => {
+    const map: SpriteAtlasMap = {
+      atlases: [{ src: 'assets/sprites/atlas/atlas_0.png', width: 258, height: 129 }],
+      sprites: {
+        FIU_EGG: {
+          atlas: 0,
+          gridSize: 128,
+          frames: [
+            { x: 0, y: 0, w: 128, h: 128 },
+            { x: 129, y: 0, w: 128, h: 128 },
+          ],
+        },
+      },
+    };
+
+    const cfg = atlasSpriteConfig(map, 'FIU_EGG');
+    expect(cfg).toBeDefined();
+    expect(cfg!.src.endsWith('assets/sprites/atlas/atlas_0.png')).toBe(true);
+    expect(cfg!.animations.idle.frames).toBe(2);
+    expect(cfg!.animations.eat.frameRects?.[1]).toEqual({ x: 129, y: 0, w: 128, h: 128 });
+    expect(atlasSpriteConfig(map, 'SEAL_EGG')).toBeUndefined();
+  });
 });
@@ -1,8 +1,16 @@
-import type { SpriteConfig, AnimationDef, AnimationState } from './SpriteRenderer';
+import type { PetLine } from '@pompom/core';
+import type { SpriteConfig, AnimationDef, AnimationState, FrameRect } from './SpriteRenderer';
 import { LoremPicsum } from '../utils/LoremPicsum';
+import hashedAssets from './hashedAssets.json';
+import trimmedFrames from './trimmedFrames.json';
 
 const B = import.meta.env.BASE_URL;
 
+/** URL for a strip: its content-hashed copy when `scripts/hash_assets.py` wrote one, else the stable path. */
+function asset(key: string, path: string): string {
+  return `${B}${(hashedAssets as Record<string, string>)[key] ?? path}`;
+}
+
 function singleRowAnimations(frames: number): Record<AnimationState, AnimationDef> {
   return {
     idle: { row: 0, frames, loop: true, speed: 2 },
@@ -33,41 +41,83 @@ function multiRowAnimations(frames: number): Record<AnimationState, AnimationDef
 
 export const SPRITE_CONFIGS: Record<string, SpriteConfig> = {
   // FIU line
-  FIU_EGG: { src: `${B}assets/sprites/fiu/egg.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FIU_BABY: { src: `${B}assets/sprites/fiu/baby.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FIU_TEEN: { src: `${B}assets/sprites/fiu/teen.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FIU_PERFECT: { src: `${B}assets/sprites/fiu/perfect.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FIU_COMMON: { src: `${B}assets/sprites/fiu/common.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FIU_FAIL: { src: `${B}assets/sprites/fiu/fail.png`, gridSize: 128, animations: multiRowAnimations(3) },
+  FIU_EGG: { src: asset('FIU_EGG', 'assets/sprites/fiu/egg.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FIU_BABY: { src: asset('FIU_BABY', 'assets/sprites/fiu/baby.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FIU_TEEN: { src: asset('FIU_TEEN', 'assets/sprites/fiu/teen.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FIU_PERFECT: { src: asset('FIU_PERFECT', 'assets/sprites/fiu/perfect.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FIU_COMMON: { src: asset('FIU_COMMON', 'assets/sprites/fiu/common.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FIU_FAIL: { src: asset('FIU_FAIL', 'assets/sprites/fiu/fail.png'), gridSize: 128, animations: multiRowAnimations(3) },
 
   // Salchicha line
-  SALCHICHA_EGG: { src: `${B}assets/sprites/salchicha/egg.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SALCHICHA_BABY: { src: `${B}assets/sprites/salchicha/baby.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SALCHICHA_TEEN: { src: `${B}assets/sprites/salchicha/teen.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SALCHICHA_PERFECT: { src: `${B}assets/sprites/salchicha/perfect.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SALCHICHA_BROWN: { src: `${B}assets/sprites/salchicha/brown.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SALCHICHA_FAIL: { src: `${B}assets/sprites/salchicha/fail.png`, gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_EGG: { src: asset('SALCHICHA_EGG', 'assets/sprites/salchicha/egg.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_BABY: { src: asset('SALCHICHA_BABY', 'assets/sprites/salchicha/baby.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_TEEN: { src: asset('SALCHICHA_TEEN', 'assets/sprites/salchicha/teen.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_PERFECT: { src: asset('SALCHICHA_PERFECT', 'assets/sprites/salchicha/perfect.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_BROWN: { src: asset('SALCHICHA_BROWN', 'assets/sprites/salchicha/brown.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SALCHICHA_FAIL: { src: asset('SALCHICHA_FAIL', 'assets/sprites/salchicha/fail.png'), gridSize: 128, animations: multiRowAnimations(4) },
 
   // Flan / PomPomPurin line
-  FLAN_BEBE: { src: `${B}assets/sprites/flan/bebe.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FLAN_TEEN: { src: `${B}assets/sprites/flan/teen.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  FLAN_ADULT: { src: `${B}assets/sprites/flan/adult.png`, gridSize: 128, animations: multiRowAnimations(3) },
-  POMPOMPURIN: { src: `${B}assets/sprites/flan/pompompurin.png`, gridSize: 128, animations: multiRowAnimations(3) },
-  BAGEL: { src: `${B}assets/sprites/flan/bagel.png`, gridSize: 128, animations: multiRowAnimations(3) },
-  MUFFIN: { src: `${B}assets/sprites/flan/muffin.png`, gridSize: 128, animations: multiRowAnimations(3) },
-  SCONE: { src: `${B}assets/sprites/flan/scone.png`, gridSize: 128, animations: multiRowAnimations(4) },
+  FLAN_BEBE: { src: asset('FLAN_BEBE', 'assets/sprites/flan/bebe.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FLAN_TEEN: { src: asset('FLAN_TEEN', 'assets/sprites/flan/teen.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  FLAN_ADULT: { src: asset('FLAN_ADULT', 'assets/sprites/flan/adult.png'), gridSize: 128, animations: multiRowAnimations(3) },
+  POMPOMPURIN: { src: asset('POMPOMPURIN', 'assets/sprites/flan/pompompurin.png'), gridSize: 128, animations: multiRowAnimations(3) },
+  BAGEL: { src: asset('BAGEL', 'assets/sprites/flan/bagel.png'), gridSize: 128, animations: multiRowAnimations(3) },
+  MUFFIN: { src: asset('MUFFIN', 'assets/sprites/flan/muffin.png'), gridSize: 128, animations: multiRowAnimations(3) },
+  SCONE: { src: asset('SCONE', 'assets/sprites/flan/scone.png'), gridSize: 128, animations: multiRowAnimations(4) },
 
   // Seal line
-  SEAL_EGG: { src: `${B}assets/sprites/seal/egg.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SEAL_BABY: { src: `${B}assets/sprites/seal/baby.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SEAL_TEEN: { src: `${B}assets/sprites/seal/teen.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SEAL_PERFECT: { src: `${B}assets/sprites/seal/perfect.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SEAL_BROWN: { src: `${B}assets/sprites/seal/brown.png`, gridSize: 128, animations: multiRowAnimations(4) },
-  SEAL_FAIL: { src: `${B}assets/sprites/seal/fail.png`, gridSize: 128, animations: multiRowAnimations(3) },
+  SEAL_EGG: { src: asset('SEAL_EGG', 'assets/sprites/seal/egg.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SEAL_BABY: { src: asset('SEAL_BABY', 'assets/sprites/seal/baby.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SEAL_TEEN: { src: asset('SEAL_TEEN', 'assets/sprites/seal/teen.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SEAL_PERFECT: { src: asset('SEAL_PERFECT', 'assets/sprites/seal/perfect.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SEAL_BROWN: { src: asset('SEAL_BROWN', 'assets/sprites/seal/brown.png'), gridSize: 128, animations: multiRowAnimations(4) },
+  SEAL_FAIL: { src: asset('SEAL_FAIL', 'assets/sprites/seal/fail.png'), gridSize: 128, animations: multiRowAnimations(3) },
+};
+
+/** Every form a pet of each line can evolve through; GameLoop loads these up front so an evolution never draws blank frames. */
+export const LINE_SPRITES: Record<PetLine, string[]> = {
+  fiu: ['FIU_EGG', 'FIU_BABY', 'FIU_TEEN', 'FIU_PERFECT', 'FIU_COMMON', 'FIU_FAIL'],
+  salchicha: ['SALCHICHA_EGG', 'SALCHICHA_BABY', 'SALCHICHA_TEEN', 'SALCHICHA_PERFECT', 'SALCHICHA_BROWN', 'SALCHICHA_FAIL'],
+  flan: ['FLAN_BEBE', 'FLAN_TEEN', 'FLAN_ADULT', 'POMPOMPURIN', 'BAGEL', 'MUFFIN', 'SCONE'],
+  seal: ['SEAL_EGG', 'SEAL_BABY', 'SEAL_TEEN', 'SEAL_PERFECT', 'SEAL_BROWN', 'SEAL_FAIL'],
 };
 
+// Strips written by `scripts/extract_canon_sprites.py --trim` are packed
+// tightly, so they are drawn through their per-frame rects, not the grid.
+for (const [key, rects] of Object.entries(trimmedFrames as Record<string, FrameRect[]>)) {
+  const config = SPRITE_CONFIGS[key];
+  if (!config) continue;
+  for (const anim of Object.values(config.animations)) {
+    anim.frameRects = rects;
+  }
+}
+
 export const PLACEHOLDER_SPRITE: SpriteConfig = {
   src: LoremPicsum.getSeeded('tamagotchi', 1024, 1024),
   gridSize: 256,
   animations: singleRowAnimations(4),
 };
+
+/** Frame map written by `scripts/build_atlas.py` (assets/sprites/atlas/atlas.json). */
+export interface SpriteAtlasMap {
+  atlases: { src: string; width: number; height: number }[];
+  sprites: Record<string, { atlas: number; gridSize: number; frames: FrameRect[] }>;
+}
+
+/**
+ * Build a SpriteConfig that draws `key` from its packed atlas page via explicit frame rects.
+ * Nothing at runtime calls this yet: the renderer still loads the per-species strips.
+ */
+export function atlasSpriteConfig(map: SpriteAtlasMap, key: string): SpriteConfig | undefined {
+  const sprite = map.sprites[key];
+  if (!sprite) return undefined;
+  const animations = multiRowAnimations(sprite.frames.length);
+  for (const anim of Object.values(animations)) {
+    anim.frameRects = sprite.frames;
+  }
+  return {
+    src: `${B}${map.atlases[sprite.atlas].src}`,
+    gridSize: sprite.gridSize,
+    animations,
+  };
+}
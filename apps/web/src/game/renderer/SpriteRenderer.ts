@@ -6,6 +6,40 @@ export interface FrameRect {
     y: number;
     w: number;
     h: number;
+    /**
+     * Trimmed frames: where the rect sits inside the original (untrimmed) frame,
+     * and that frame's size. Drawing honours them so trimming is invisible on screen.
+     */
+    offsetX?: number;
+    offsetY?: number;
+    sourceW?: number;
+    sourceH?: number;
+}
+
+/** Destination rect inside a displaySize box for a source rect, keeping aspect ratio. */
+function frameDestRect(srcW: number, srcH: number, displaySize: number, rect?: FrameRect) {
+    // Trimmed frames are laid out against their original frame size.
+    const fullW = rect?.sourceW ?? srcW;
+    const fullH = rect?.sourceH ?? srcH;
+
+    const aspect = fullW / fullH;
+    let drawW: number;
+    let drawH: number;
+    if (aspect >= 1) {
+        drawW = displaySize;
+        drawH = displaySize / aspect;
+    } else {
+        drawH = displaySize;
+        drawW = displaySize * aspect;
+    }
+    // Center within the displaySize box
+    const scale = drawW / fullW;
+    return {
+        x: (displaySize - drawW) / 2 + (rect?.offsetX ?? 0) * scale,
+        y: (displaySize - drawH) / 2 + (rect?.offsetY ?? 0) * scale,
+        w: srcW * scale,
+        h: srcH * scale,
+    };
 }
 
 export interface AnimationDef {
@@ -30,6 +64,13 @@ export interface SpriteConfig {
 
 export class AssetManager {
     private images: Record<string, HTMLImageElement> = {};
+    private sources: Record<string, string> = {};
+    private requested = new Set<string>();
+
+    /** Remember where `key` lives without loading it; the first get() starts the load. */
+    register(key: string, src: string): void {
+        this.sources[key] = src;
+    }
 
     async load(key: string, src: string): Promise<void> {
         return new Promise((resolve, reject) => {
@@ -47,7 +88,12 @@ export class AssetManager {
     }
 
     get(key: string): HTMLImageElement | undefined {
-        return this.images[key];
+        const img = this.images[key];
+        if (!img && this.sources[key] && !this.requested.has(key)) {
+            this.requested.add(key);
+            this.load(key, this.sources[key]).catch(() => {});
+        }
+        return img;
     }
 }
 
@@ -155,10 +201,10 @@ export class SpriteRenderer {
         let srcY: number;
         let srcW: number;
         let srcH: number;
+        const rect = animConfig.frameRects?.[frameIndex];
 
-        if (animConfig.frameRects && animConfig.frameRects[frameIndex]) {
+        if (rect) {
             // Explicit per-frame rect — highest priority
-            const rect = animConfig.frameRects[frameIndex];
             srcX = rect.x;
             srcY = rect.y;
             srcW = rect.w;
@@ -176,19 +222,7 @@ export class SpriteRenderer {
         }
 
         // Calculate display size maintaining aspect ratio
-        const aspect = srcW / srcH;
-        let drawW: number;
-        let drawH: number;
-        if (aspect >= 1) {
-            drawW = displaySize;
-            drawH = displaySize / aspect;
-        } else {
-            drawH = displaySize;
-            drawW = displaySize * aspect;
-        }
-        // Center within the displaySize box
-        const offsetX = (displaySize - drawW) / 2;
-        const offsetY = (displaySize - drawH) / 2;
+        const dest = frameDestRect(srcW, srcH, displaySize, rect);
 
         ctx.save();
         ctx.imageSmoothingEnabled = false;
@@ -196,10 +230,10 @@ export class SpriteRenderer {
         if (flipX) {
             ctx.translate(x + displaySize, y);
             ctx.scale(-1, 1);
-            ctx.drawImage(img, srcX, srcY, srcW, srcH, offsetX, offsetY, drawW, drawH);
+            ctx.drawImage(img, srcX, srcY, srcW, srcH, dest.x, dest.y, dest.w, dest.h);
         } else {
             ctx.translate(x, y);
-            ctx.drawImage(img, srcX, srcY, srcW, srcH, offsetX, offsetY, drawW, drawH);
+            ctx.drawImage(img, srcX, srcY, srcW, srcH, dest.x, dest.y, dest.w, dest.h);
         }
 
         ctx.restore();
@@ -231,9 +265,9 @@ export class SpriteRenderer {
         let srcY: number;
         let srcW: number;
         let srcH: number;
+        const rect = animConfig.frameRects?.[actualFrame];
 
-        if (animConfig.frameRects && animConfig.frameRects[actualFrame]) {
-            const rect = animConfig.frameRects[actualFrame];
+        if (rect) {
             srcX = rect.x;
             srcY = rect.y;
             srcW = rect.w;
@@ -248,18 +282,7 @@ export class SpriteRenderer {
             srcH = rowH;
         }
 
-        const aspect = srcW / srcH;
-        let drawW: number;
-        let drawH: number;
-        if (aspect >= 1) {
-            drawW = displaySize;
-            drawH = displaySize / aspect;
-        } else {
-            drawH = displaySize;
-            drawW = displaySize * aspect;
-        }
-        const offsetX = (displaySize - drawW) / 2;
-        const offsetY = (displaySize - drawH) / 2;
+        const dest = frameDestRect(srcW, srcH, displaySize, rect);
 
         ctx.save();
         ctx.imageSmoothingEnabled = false;
@@ -267,10 +290,10 @@ export class SpriteRenderer {
         if (flipX) {
             ctx.translate(x + displaySize, y);
             ctx.scale(-1, 1);
-            ctx.drawImage(img, srcX, srcY, srcW, srcH, offsetX, offsetY, drawW, drawH);
+            ctx.drawImage(img, srcX, srcY, srcW, srcH, dest.x, dest.y, dest.w, dest.h);
         } else {
             ctx.translate(x, y);
-            ctx.drawImage(img, srcX, srcY, srcW, srcH, offsetX, offsetY, drawW, drawH);
+            ctx.drawImage(img, srcX, srcY, srcW, srcH, dest.x, dest.y, dest.w, dest.h);
         }
 
         ctx.restore();
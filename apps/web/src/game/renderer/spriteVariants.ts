@@ -0,0 +1,95 @@
+import type { AssetManager, FrameRect, SpriteConfig } from './SpriteRenderer';
+import hashedAssets from './hashedAssets.json';
+import variantManifest from './spriteVariants.json';
+
+/** One scaled copy of a strip or atlas page, written by `scripts/sprite_variants.py`. */
+export interface SpriteVariant {
+  scale: number;
+  src: string;
+  width: number;
+  height: number;
+}
+
+const B = import.meta.env.BASE_URL;
+const VARIANTS = variantManifest as Record<string, SpriteVariant[]>;
+const HASHED = new Set(Object.values(hashedAssets as Record<string, string>));
+
+/**
+ * Variants of the image at `src`. The manifest is keyed by stable paths; once
+ * `scripts/hash_assets.py` has run, configs point at `<stem>.<10 hex>.png`
+ * copies, which are looked up under the name they were copied from.
+ */
+function variantsOf(src: string): SpriteVariant[] | undefined {
+  const path = src.startsWith(B) ? src.slice(B.length) : src;
+  return VARIANTS[HASHED.has(path) ? path.replace(/\.[0-9a-f]{10}(\.\w+)$/, '$1') : path];
+}
+
+/** Whether `src` has scaled copies; such strips are only loaded at 1x when something draws them at 1x. */
+export function hasVariants(src: string): boolean {
+  return (variantsOf(src)?.length ?? 0) > 1;
+}
+
+/**
+ * The smallest variant whose cells are still at least `drawSize * pixelRatio`
+ * pixels, so the texture is never upscaled more than the 1x one would be.
+ * `pixelRatio` is canvas pixels per draw unit (1 for the fixed 320x240 LCD).
+ * Undefined when the image has no variants.
+ */
+export function pickVariant(src: string, cellSize: number, drawSize: number, pixelRatio = 1): SpriteVariant | undefined {
+  const variants = variantsOf(src);
+  if (!variants?.length) return undefined;
+  const needed = drawSize * pixelRatio;
+  return variants.find((v) => cellSize * v.scale >= needed) ?? variants[variants.length - 1];
+}
+
+/** Source rects stay on whole pixels: the scaled rect covers every pixel the frame touches. */
+function scaleRect(rect: FrameRect, scale: number): FrameRect {
+  const x = Math.floor(rect.x * scale);
+  const y = Math.floor(rect.y * scale);
+  const out: FrameRect = {
+    x,
+    y,
+    w: Math.ceil((rect.x + rect.w) * scale) - x,
+    h: Math.ceil((rect.y + rect.h) * scale) - y,
+  };
+  if (rect.offsetX !== undefined) out.offsetX = rect.offsetX * scale;
+  if (rect.offsetY !== undefined) out.offsetY = rect.offsetY * scale;
+  if (rect.sourceW !== undefined) out.sourceW = rect.sourceW * scale;
+  if (rect.sourceH !== undefined) out.sourceH = rect.sourceH * scale;
+  return out;
+}
+
+/** `config` pointed at the variant that fits `drawSize`, with cell sizes and frame rects scaled to match. */
+export function configForSize(config: SpriteConfig, drawSize: number, pixelRatio = 1): { config: SpriteConfig; scale: number } {
+  const variant = pickVariant(config.src, config.gridSize, drawSize, pixelRatio);
+  if (!variant || variant.scale === 1) return { config, scale: 1 };
+  const s = variant.scale;
+  const animations = Object.fromEntries(
+    Object.entries(config.animations).map(([name, anim]) => [
+      name,
+      anim.frameRects ? { ...anim, frameRects: anim.frameRects.map((r) => scaleRect(r, s)) } : anim,
+    ]),
+  ) as SpriteConfig['animations'];
+  const scaled: SpriteConfig = { src: `${B}${variant.src}`, gridSize: config.gridSize * s, animations };
+  if (config.rowHeight !== undefined) scaled.rowHeight = config.rowHeight * s;
+  return { config: scaled, scale: s };
+}
+
+/**
+ * Asset key and config for drawing `key` at `drawSize`. Only the chosen image
+ * is loaded (a scaled variant under its own key), starting right away so it
+ * is normally there by the first frame; the 1x strip is not pulled in.
+ */
+export function sizedSprite(
+  assetManager: AssetManager,
+  key: string,
+  config: SpriteConfig,
+  drawSize: number,
+  pixelRatio = 1,
+): { key: string; config: SpriteConfig } {
+  const sized = configForSize(config, drawSize, pixelRatio);
+  const sizedKey = sized.scale === 1 ? key : `${key}@${sized.scale}x`;
+  assetManager.register(sizedKey, sized.config.src);
+  assetManager.get(sizedKey);
+  return { key: sizedKey, config: sized.config };
+}
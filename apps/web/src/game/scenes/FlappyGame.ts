@@ -3,6 +3,7 @@ import type { InputCommand } from '../Input';
 import { PALETTE } from '../palette';
 import { SpriteRenderer } from '../renderer/SpriteRenderer';
 import { SPRITE_CONFIGS } from '../renderer/SpriteConfigs';
+import { sizedSprite } from '../renderer/spriteVariants';
 
 interface Pipe {
     x: number;
@@ -34,8 +35,9 @@ export class FlappyGame extends Scene {
         this.gameState = 'playing';
 
         if (this.context.assetManager) {
-            const config = SPRITE_CONFIGS['FIU_BABY'];
-            this.birdRenderer = new SpriteRenderer(this.context.assetManager, 'FIU_BABY', config);
+            // Drawn at 40px: use the smallest strip variant that still covers it.
+            const sprite = sizedSprite(this.context.assetManager, 'FIU_BABY', SPRITE_CONFIGS['FIU_BABY'], 40);
+            this.birdRenderer = new SpriteRenderer(this.context.assetManager, sprite.key, sprite.config);
             this.birdRenderer.displaySize = 40;
             this.birdRenderer.setAnimation('idle');
         }
@@ -3,6 +3,7 @@ import type { InputCommand } from '../Input';
 import { PALETTE } from '../palette';
 import { SpriteRenderer } from '../renderer/SpriteRenderer';
 import { SPRITE_CONFIGS } from '../renderer/SpriteConfigs';
+import { sizedSprite } from '../renderer/spriteVariants';
 
 interface GameItem {
     x: number;
@@ -35,8 +36,9 @@ export class SealGame extends Scene {
         this.gameState = 'playing';
 
         if (this.context.assetManager) {
-            const config = SPRITE_CONFIGS['SEAL_BABY'];
-            this.sealRenderer = new SpriteRenderer(this.context.assetManager, 'SEAL_BABY', config);
+            // Drawn at 50px: use the smallest strip variant that still covers it.
+            const sprite = sizedSprite(this.context.assetManager, 'SEAL_BABY', SPRITE_CONFIGS['SEAL_BABY'], 50);
+            this.sealRenderer = new SpriteRenderer(this.context.assetManager, sprite.key, sprite.config);
             this.sealRenderer.displaySize = 50;
             this.sealRenderer.setAnimation('idle');
         }
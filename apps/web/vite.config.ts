@@ -1,7 +1,34 @@
-import { defineConfig } from 'vite';
+import { readFileSync, rmSync } from 'node:fs';
+import { resolve } from 'node:path';
+import { defineConfig, type Plugin } from 'vite';
+
+/**
+ * Drop the stable-name copy of every strip `scripts/hash_assets.py` mapped to
+ * a content-hashed one. The app only requests the hashed URL, so shipping
+ * both would double the sprite bytes of a deploy.
+ */
+function dropHashedOriginals(): Plugin {
+    let root = '';
+    let outDir = '';
+    return {
+        name: 'drop-hashed-originals',
+        apply: 'build',
+        configResolved(config) {
+            root = config.root;
+            outDir = resolve(config.root, config.build.outDir);
+        },
+        closeBundle() {
+            const map = JSON.parse(readFileSync(resolve(root, 'src/game/renderer/hashedAssets.json'), 'utf8')) as Record<string, string>;
+            for (const hashed of Object.values(map)) {
+                rmSync(resolve(outDir, hashed.replace(/\.[0-9a-f]{10}(\.\w+)$/, '$1')), { force: true });
+            }
+        },
+    };
+}
 
 export default defineConfig({
     base: process.env.VITE_BASE_PATH || '/',
+    plugins: [dropHashedOriginals()],
     // @ts-ignore - Vitest types
     test: {
         environment: 'jsdom',
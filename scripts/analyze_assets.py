@@ -1,15 +1,177 @@
+"""Size and content report for every image under the asset tree.
+
+Each image is decoded in a worker process and summarised: dimensions, mode,
+unique colour count, content bbox (non-transparent pixels), how much of the
+canvas is transparent padding and how many file bytes each visible pixel
+costs. The report goes to CSV or JSON (by the --report suffix); the console
+gets the heaviest files with what looks wrong about them.
+
+    python scripts/analyze_assets.py
+    python scripts/analyze_assets.py apps/web/public --report assets.csv --top 20
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+import numpy as np
 from PIL import Image
 
-assets_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets"
+from pipeline_trace import count, span
+
+
+ROOT = Path(__file__).resolve().parents[1]
+ASSETS = ROOT / "apps/web/public/assets"
+EXTENSIONS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP", ".gif": "GIF"}
+
+# Thresholds for the offender flags.
+PADDING_FLAG = 0.5
+BYTES_PER_PIXEL_FLAG = 1.0
+
+
+@dataclass(frozen=True)
+class ImageStats:
+    path: str  # ROOT-relative when under ROOT
+    bytes: int
+    format: str | None = None
+    width: int = 0
+    height: int = 0
+    mode: str | None = None
+    colors: int = 0  # unique RGBA values
+    bbox: tuple[int, int, int, int] | None = None  # non-transparent content, exclusive
+    visible_pixels: int = 0
+    padding_ratio: float = 0.0  # canvas outside bbox / canvas
+    bytes_per_visible_pixel: float | None = None
+    error: str | None = None
+
+    def flags(self) -> list[str]:
+        if self.error:
+            return ["unreadable"]
+        out = []
+        named = EXTENSIONS.get(Path(self.path).suffix.lower())
+        if named and self.format != named:
+            out.append(f"{self.format} data in a {Path(self.path).suffix} file")
+        if self.padding_ratio > PADDING_FLAG:
+            out.append(f"{self.padding_ratio:.0%} padding")
+        if self.bytes_per_visible_pixel is not None and self.bytes_per_visible_pixel > BYTES_PER_PIXEL_FLAG:
+            out.append(f"{self.bytes_per_visible_pixel:.2f} B/visible px")
+        if self.format == "PNG" and self.mode != "P" and 0 < self.colors <= 256:
+            out.append(f"{self.colors} colours, not paletted")
+        if self.visible_pixels == 0:
+            out.append("fully transparent")
+        return out
+
+
+def _display(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def analyze(path: Path) -> ImageStats:
+    with span("file", path=_display(path)):
+        return _analyze(path)
+
+
+def _analyze(path: Path) -> ImageStats:
+    size = path.stat().st_size
+    try:
+        with span("load"), Image.open(path) as img:
+            img.load()
+            fmt, mode = img.format, img.mode
+            rgba = np.asarray(img.convert("RGBA"))
+    except Exception as exc:  # a broken file is a finding, not a crash
+        return ImageStats(_display(path), size, error=f"{type(exc).__name__}: {exc}")
+
+    h, w = rgba.shape[:2]
+    count("pixels", h * w)
+    colors = int(np.unique(rgba.reshape(-1, 4).copy().view(np.uint32)).size) if h and w else 0
+    alpha = rgba[..., 3] > 0
+    visible = int(np.count_nonzero(alpha))
+    bbox = None
+    padding = 1.0
+    if visible:
+        xs = np.flatnonzero(alpha.any(axis=0))
+        ys = np.flatnonzero(alpha.any(axis=1))
+        bbox = (int(xs[0]), int(ys[0]), int(xs[-1]) + 1, int(ys[-1]) + 1)
+        padding = 1 - (bbox[2] - bbox[0]) * (bbox[3] - bbox[1]) / (w * h)
+    return ImageStats(
+        _display(path),
+        size,
+        fmt,
+        w,
+        h,
+        mode,
+        colors,
+        bbox,
+        visible,
+        round(padding, 4),
+        round(size / visible, 4) if visible else None,
+    )
+
+
+def collect(paths: list[Path], pattern: str = "*") -> list[Path]:
+    files: list[Path] = []
+    for p in paths:
+        if p.is_dir():
+            files.extend(f for f in p.rglob(pattern) if f.suffix.lower() in EXTENSIONS)
+        else:
+            files.append(p)
+    return sorted(set(files))
+
+
+def analyze_all(files: list[Path], jobs: int = 0) -> list[ImageStats]:
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    if jobs == 1 or len(files) < 2:
+        return [analyze(f) for f in files]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(analyze, files, chunksize=max(1, len(files) // (jobs * 4))))
+
+
+def write_report(stats: list[ImageStats], path: Path) -> None:
+    if path.suffix.lower() == ".csv":
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow([f.name for f in fields(ImageStats)] + ["flags"])
+            for s in stats:
+                row = asdict(s)
+                row["bbox"] = " ".join(map(str, s.bbox)) if s.bbox else ""
+                writer.writerow(list(row.values()) + ["; ".join(s.flags())])
+    else:
+        rows = [{**asdict(s), "flags": s.flags()} for s in stats]
+        path.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report size and content stats for every image in the asset tree.")
+    parser.add_argument("paths", nargs="*", type=Path, help=f"files or folders, searched recursively (default: {ASSETS})")
+    parser.add_argument("--pattern", default="*", help="file name glob inside folders, e.g. 'flan_teen_*'")
+    parser.add_argument("--report", type=Path, help="write every row to this .csv or .json file")
+    parser.add_argument("--top", type=int, default=10, help="heaviest files to list")
+    parser.add_argument("--jobs", type=int, default=0, help="worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    files = collect(args.paths or [ASSETS], args.pattern)
+    stats = analyze_all(files, args.jobs)
+    if args.report:
+        write_report(stats, args.report)
+        print(f"report: {args.report}")
+
+    total = sum(s.bytes for s in stats)
+    print(f"{len(stats)} images, {total} bytes")
+    print(f"heaviest {min(args.top, len(stats))}:")
+    for s in sorted(stats, key=lambda s: s.bytes, reverse=True)[: args.top]:
+        flags = ", ".join(s.flags())
+        print(f"  {s.bytes:>9}  {s.path}  {s.width}x{s.height} {s.mode}" + (f"  [{flags}]" if flags else ""))
+    return 0
 
-print(f"Analyzing images in {assets_dir}")
 
-for filename in os.listdir(assets_dir):
-    if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-        filepath = os.path.join(assets_dir, filename)
-        try:
-            with Image.open(filepath) as img:
-                print(f"{filename}: {img.size} ({img.format}) mode={img.mode}")
-        except Exception as e:
-            print(f"Error reading {filename}: {e}")
+if __name__ == "__main__":
+    sys.exit(main())
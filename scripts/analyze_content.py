@@ -1,14 +1,16 @@
-from PIL import Image
-import os
+from pathlib import Path
 
-path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_clean.png"
+from decode_cache import open_cached
+
+ROOT = Path(__file__).resolve().parents[1]
+path = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
 
 def analyze():
-    if not os.path.exists(path):
+    if not path.exists():
         print("File not found")
         return
 
-    img = Image.open(path)
+    img = open_cached(path)
     print(f"Image Size: {img.size}")
 
     # Get bounding box of the whole non-transparent area
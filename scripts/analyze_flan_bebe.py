@@ -1,15 +1,15 @@
-from PIL import Image
-import os
-
 import sys
+from pathlib import Path
+
+from decode_cache import open_cached
 
 if len(sys.argv) > 1:
     image_path = sys.argv[1]
 else:
-    image_path = r"c:\Users\mirtg\.gemini\antigravity\brain\6899a526-21a2-45d5-a70d-9fddfc100f22\flan_bebe_1771215172347.png"
+    image_path = Path(__file__).resolve().parents[1] / "apps/web/public/assets/flan_bebe_v2.png"
 
 try:
-    with Image.open(image_path) as img:
+    with open_cached(image_path) as img:
         print(f"Format: {img.format}")
         print(f"Size: {img.size}")
         print(f"Mode: {img.mode}")
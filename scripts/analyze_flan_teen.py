@@ -1,18 +1,19 @@
-from PIL import Image
-import os
-import glob
+from analyze_assets import ASSETS, analyze_all, collect
 
-assets_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets"
-search_pattern = os.path.join(assets_dir, "flan_teen_*.png")
 
-files = glob.glob(search_pattern)
-print(f"Found {len(files)} flan_teen candidates.")
+def main():
+    files = collect([ASSETS], "flan_teen_*.png")
+    print(f"Found {len(files)} flan_teen candidates.")
 
-for file_path in files:
-    try:
-        with Image.open(file_path) as img:
-            print(f"File: {os.path.basename(file_path)}")
-            print(f"  Size: {img.size}")
-            print(f"  Mode: {img.mode}")
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
+    for stats in analyze_all(files):
+        if stats.error:
+            print(f"Error reading {stats.path}: {stats.error}")
+            continue
+        print(f"File: {stats.path}")
+        print(f"  Size: {(stats.width, stats.height)}")
+        print(f"  Mode: {stats.mode}")
+        print(f"  Colours: {stats.colors}, content bbox: {stats.bbox}, padding: {stats.padding_ratio:.0%}")
+
+
+if __name__ == "__main__":
+    main()
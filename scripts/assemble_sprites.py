@@ -1,9 +1,15 @@
 import os
+from pathlib import Path
+
 from PIL import Image
 
+from pipeline_trace import count, span
+from png_optimize import save_png
+
 # Configuration
-ASSET_DIR = r"apps/web/public/assets/pompom"
-OUTPUT_FILE = r"apps/web/public/assets/pompom_spritesheet.png"
+ROOT = Path(__file__).resolve().parents[1]
+ASSET_DIR = ROOT / "apps/web/public/assets/pompom"
+OUTPUT_FILE = ROOT / "apps/web/public/assets/pompom_spritesheet.png"
 GRID_SIZE = 48
 
 # Animation order (defines the rows)
@@ -18,10 +24,10 @@ ANIMATION_ORDER = [
     'evolve'
 ]
 
-def assemble_sprites():
+def assemble_sprites(asset_dir=ASSET_DIR, output_file=OUTPUT_FILE):
     # Collect all frame files
     frames = {}
-    for filename in os.listdir(ASSET_DIR):
+    for filename in os.listdir(asset_dir):
         if not filename.endswith('.png') or filename == "pompom_spritesheet.png":
             continue
 
@@ -60,12 +66,15 @@ def assemble_sprites():
             anim_frames = sorted(frames[anim], key=lambda x: x[0])
 
             for col_index, (f_idx, f_name) in enumerate(anim_frames):
-                img_path = os.path.join(ASSET_DIR, f_name)
+                img_path = os.path.join(asset_dir, f_name)
                 try:
-                    img = Image.open(img_path).convert("RGBA")
+                    with span("load", path=f_name):
+                        img = Image.open(img_path).convert("RGBA")
+                    count("frames")
                     # Resize if not 48x48 (just in case)
                     if img.size != (GRID_SIZE, GRID_SIZE):
-                        img = img.resize((GRID_SIZE, GRID_SIZE), Image.NEAREST)
+                        with span("resize"):
+                            img = img.resize((GRID_SIZE, GRID_SIZE), Image.NEAREST)
 
                     x = col_index * GRID_SIZE
                     y = row_index * GRID_SIZE
@@ -75,8 +84,9 @@ def assemble_sprites():
                     print(f"Error processing {f_name}: {e}")
 
     # Save
-    sprite_sheet.save(OUTPUT_FILE)
-    print(f"Saved sprite sheet to {OUTPUT_FILE}")
+    with span("save", path=str(output_file)):
+        save_png(sprite_sheet, output_file)
+    print(f"Saved sprite sheet to {output_file}")
 
 if __name__ == "__main__":
     assemble_sprites()
@@ -0,0 +1,436 @@
+"""Incremental asset build: every transform is a node with declared inputs and outputs.
+
+    python -m scripts.asset_build                   # rebuild whatever is out of date
+    python -m scripts.asset_build canon-atlas       # a target plus everything upstream of it
+    python -m scripts.asset_build --list
+    python -m scripts.asset_build --force --jobs 4
+
+A node is up to date when its inputs (its transform script and the sibling
+modules it imports, directly or not, included) and its outputs hash the same
+as after its last successful build. A node runs after
+the nodes producing its inputs; nodes that do not depend on each other run in
+parallel worker processes. A node whose source art is not in the checkout
+reports "no source" and leaves its committed outputs alone; the nodes after
+it still run from those committed files (the atlas, precache manifest and
+variants only need the strips in the tree). A failed node skips everything
+downstream of it.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable
+
+# `python -m scripts.asset_build` puts the repo root on sys.path; the transforms
+# import each other as flat siblings.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import assemble_sprites  # noqa: E402
+import build_atlas  # noqa: E402
+import extract_canon_sprites  # noqa: E402
+import fix_final  # noqa: E402
+import fix_flan_40px  # noqa: E402
+import fix_flan_crop  # noqa: E402
+import fix_flan_sprite  # noqa: E402
+import hash_assets  # noqa: E402
+import precache_manifest  # noqa: E402
+import process_sprites  # noqa: E402
+import process_ui  # noqa: E402
+import remove_background  # noqa: E402
+import slice_flan_bebe  # noqa: E402
+import sprite_variants  # noqa: E402
+from extract_canon_sprites import ROOT, load_json, write_if_changed  # noqa: E402
+from pipeline_trace import span  # noqa: E402
+
+
+CACHE = ROOT / "scripts/.cache/asset_build.json"
+ASSETS = "apps/web/public/assets/"
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    script: str
+    run: Callable[["Node"], None]
+    # ROOT-relative paths; entries containing "*" are globs.
+    inputs: tuple[str, ...]
+    outputs: tuple[str, ...]
+    # Hashed and waited for like inputs when present, but not required.
+    optional: tuple[str, ...] = ()
+
+    def path(self, pattern: str) -> Path:
+        return ROOT / pattern
+
+
+def _flan_v3(node: Node) -> None:
+    fix_flan_sprite.fix_flan_sprite(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_strip(node: Node) -> None:
+    process_sprites.process(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_40px(node: Node) -> None:
+    fix_final.process(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_40px_fit(node: Node) -> None:
+    fix_flan_40px.process_image(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_40px_crop(node: Node) -> None:
+    fix_flan_crop.process_image(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_transparent(node: Node) -> None:
+    remove_background.remove_background(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _flan_slices(node: Node) -> None:
+    slice_flan_bebe.slice_sheet(node.path(node.inputs[0]), node.path(node.outputs[0]).parent)
+
+
+def _pompom_sheet(node: Node) -> None:
+    assemble_sprites.assemble_sprites(node.path(node.inputs[0]).parent, node.path(node.outputs[0]))
+
+
+def _ui_icons(node: Node) -> None:
+    process_ui.process_ui(node.path(node.inputs[0]), node.path(node.outputs[0]))
+
+
+def _canon_strips(node: Node) -> None:
+    extract_canon_sprites.main(["--source", str(node.path(node.inputs[0]))])
+
+
+def _canon_atlas(node: Node) -> None:
+    build_atlas.main(["--manifest", str(node.path(node.optional[0]))])
+
+
+def _hashed(node: Node) -> None:
+    hash_assets.main(["--manifest", str(node.path(node.optional[0]))])
+
+
+def _precache(node: Node) -> None:
+    precache_manifest.main(["--manifest", str(node.path(node.optional[0]))])
+
+
+def _variants(node: Node) -> None:
+    sprite_variants.main(["--manifest", str(node.path(node.optional[0]))])
+
+
+def _rel(path: Path) -> str:
+    return path.relative_to(ROOT).as_posix()
+
+
+CANON_STRIPS = tuple(
+    _rel(extract_canon_sprites.OUT_ROOT / spec.folder / spec.filename) for spec in extract_canon_sprites.SPECS
+)
+
+# Without the extractor's manifest (its source sheet is not committed) the
+# canon nodes below fall back to SPECS and read the committed strips.
+CANON_MANIFEST = (_rel(extract_canon_sprites.MANIFEST),)
+
+# fix_final.py produces flan_bebe_40px.png; fix_flan_40px.py (fit to 40px)
+# and fix_flan_crop.py (bottom-left quadrant) write their alternative cuts
+# beside it, since an output has one producer.
+NODES: tuple[Node, ...] = (
+    Node("flan-v3", "fix_flan_sprite.py", _flan_v3, (ASSETS + "flan_bebe_v2.png",), (ASSETS + "flan_bebe_v3.png",)),
+    Node("flan-strip", "process_sprites.py", _flan_strip, (ASSETS + "flan_bebe_v2.png",), (ASSETS + "flan_bebe_clean.png",)),
+    Node("flan-40px", "fix_final.py", _flan_40px, (ASSETS + "flan_bebe_clean.png",), (ASSETS + "flan_bebe_40px.png",)),
+    Node(
+        "flan-40px-fit",
+        "fix_flan_40px.py",
+        _flan_40px_fit,
+        (ASSETS + "flan_bebe_clean.png",),
+        (_rel(fix_flan_40px.OUTPUT_PATH),),
+    ),
+    Node(
+        "flan-40px-crop",
+        "fix_flan_crop.py",
+        _flan_40px_crop,
+        (ASSETS + "flan_bebe_clean.png",),
+        (_rel(fix_flan_crop.OUTPUT_PATH),),
+    ),
+    Node(
+        "flan-transparent",
+        "remove_background.py",
+        _flan_transparent,
+        (ASSETS + "flan_bebe_40px.png",),
+        (ASSETS + "sprites/flan_bebe_fixed.png",),
+    ),
+    Node(
+        "flan-slices",
+        "slice_flan_bebe.py",
+        _flan_slices,
+        (ASSETS + "flan_bebe_v2.png",),
+        tuple(_rel(p) for p in slice_flan_bebe.output_paths()),
+    ),
+    Node("pompom-sheet", "assemble_sprites.py", _pompom_sheet, (ASSETS + "pompom/*.png",), (ASSETS + "pompom_spritesheet.png",)),
+    Node(
+        "ui-icons-strip",
+        "process_ui.py",
+        _ui_icons,
+        (ASSETS + "retro_ui_icons_1768544742647.png",),
+        (ASSETS + "ui_icons_strip.png",),
+    ),
+    Node(
+        "canon-strips",
+        "extract_canon_sprites.py",
+        _canon_strips,
+        ("apps/web/public/Sprites/Sprite definitivo.png",),
+        (_rel(extract_canon_sprites.MANIFEST), _rel(extract_canon_sprites.FRAME_RECTS), *CANON_STRIPS),
+    ),
+    Node(
+        "canon-atlas",
+        "build_atlas.py",
+        _canon_atlas,
+        CANON_STRIPS,
+        # atlas_*[0-9].png, not atlas_*.png: the @Nx pages belong to sprite-variants.
+        (ASSETS + "sprites/atlas/atlas.json", ASSETS + "sprites/atlas/atlas_*[0-9].png"),
+        CANON_MANIFEST,
+    ),
+    Node(
+        "hashed-assets",
+        "hash_assets.py",
+        _hashed,
+        CANON_STRIPS,
+        (_rel(hash_assets.MAP_PATH), ASSETS + "sprites/*/*.??????????.png"),
+        CANON_MANIFEST,
+    ),
+    Node(
+        "precache-manifest",
+        "precache_manifest.py",
+        _precache,
+        (*CANON_STRIPS, ASSETS + "sprites/atlas/atlas.json", _rel(hash_assets.MAP_PATH)),
+        ("apps/web/public/precache-manifest.json", "apps/web/public/sw.js"),
+        CANON_MANIFEST,
+    ),
+    Node(
+        "sprite-variants",
+        "sprite_variants.py",
+        _variants,
+        (*CANON_STRIPS, ASSETS + "sprites/atlas/atlas_*[0-9].png"),
+        ("apps/web/src/game/renderer/spriteVariants.json", ASSETS + "sprites/*/*@*x.png"),
+        CANON_MANIFEST,
+    ),
+)
+
+
+def expand(pattern: str) -> list[Path]:
+    if "*" in pattern:
+        return sorted(ROOT.glob(pattern))
+    path = ROOT / pattern
+    return [path] if path.exists() else []
+
+
+def missing(patterns: tuple[str, ...]) -> list[str]:
+    return [p for p in patterns if not expand(p)]
+
+
+@lru_cache(maxsize=None)
+def script_closure(script: str) -> tuple[Path, ...]:
+    """`script` and every scripts/ module it imports, directly or through another one."""
+    scripts = ROOT / "scripts"
+    seen: dict[str, Path] = {}
+    pending = [script.removesuffix(".py")]
+    while pending:
+        name = pending.pop()
+        path = scripts / f"{name}.py"
+        if name in seen or not path.is_file():
+            continue
+        seen[name] = path
+        for node in ast.walk(ast.parse(path.read_bytes(), filename=str(path))):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module.split(".")[0])
+    return tuple(sorted(seen.values()))
+
+
+def digest(node: Node, patterns: tuple[str, ...], with_script: bool) -> str:
+    h = hashlib.sha256()
+    files = list(script_closure(node.script)) if with_script else []
+    for pattern in patterns:
+        files.extend(expand(pattern))
+    for path in files:
+        h.update(_rel(path).encode())
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def _produces(producer: Node, pattern: str) -> bool:
+    return any(out == pattern or fnmatch(out, pattern) or fnmatch(pattern, out) for out in producer.outputs)
+
+
+def dependencies(nodes: tuple[Node, ...]) -> dict[str, set[str]]:
+    producers: dict[str, str] = {}
+    for node in nodes:
+        for out in node.outputs:
+            if out in producers:
+                raise ValueError(f"{out} is produced by both {producers[out]} and {node.name}")
+            producers[out] = node.name
+    return {
+        node.name: {
+            other.name
+            for other in nodes
+            if other is not node and any(_produces(other, pattern) for pattern in node.inputs + node.optional)
+        }
+        for node in nodes
+    }
+
+
+def select(nodes: tuple[Node, ...], deps: dict[str, set[str]], targets: list[str]) -> list[Node]:
+    """`targets` plus everything upstream of them, in dependency order."""
+    by_name = {node.name: node for node in nodes}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise SystemExit(f"unknown node(s): {', '.join(unknown)} (see --list)")
+    wanted: set[str] = set()
+    stack = list(targets or by_name)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(deps[name])
+
+    ordered: list[Node] = []
+    placed: set[str] = set()
+    while len(ordered) < len(wanted):
+        ready = [n for n in nodes if n.name in wanted and n.name not in placed and deps[n.name] <= placed]
+        if not ready:
+            raise ValueError(f"dependency cycle among: {', '.join(sorted(wanted - placed))}")
+        ordered.extend(ready)
+        placed.update(n.name for n in ready)
+    return ordered
+
+
+def _execute(node: Node) -> float:
+    start = time.perf_counter()
+    with span("node", node=node.name):
+        node.run(node)
+    return time.perf_counter() - start
+
+
+def build(nodes: list[Node], deps: dict[str, set[str]], jobs: int, force: bool, dry_run: bool) -> dict[str, str]:
+    cache = load_json(CACHE)
+    status: dict[str, str] = {}
+    pending = list(nodes)
+    running: dict[Future, Node] = {}
+
+    def settle(node: Node, state: str, detail: str = "") -> None:
+        status[node.name] = state
+        print(f"{node.name}: {state}{f' ({detail})' if detail else ''}")
+
+    def schedule(pool: ProcessPoolExecutor | None) -> None:
+        for node in list(pending):
+            if not deps[node.name] <= status.keys():
+                continue
+            pending.remove(node)
+            blocked = sorted(d for d in deps[node.name] if status[d] in ("failed", "skipped"))
+            if blocked:
+                settle(node, "skipped", f"upstream {', '.join(blocked)} failed")
+                continue
+            if any(status[d] == "would build" for d in deps[node.name]):
+                settle(node, "would build", "upstream changes")
+                continue
+            absent = missing(node.inputs)
+            if absent:
+                kept = "keeping the committed outputs" if len(missing(node.outputs)) < len(node.outputs) else "nothing to build from"
+                settle(node, "no source", f"missing {', '.join(absent)}; {kept}")
+                continue
+            hit = cache.get(node.name)
+            if (
+                not force
+                and hit
+                and not missing(node.outputs)
+                and hit["inputs"] == digest(node, node.inputs + node.optional, True)
+                and hit["outputs"] == digest(node, node.outputs, False)
+            ):
+                settle(node, "up to date")
+            elif dry_run:
+                settle(node, "would build")
+            elif pool is None:
+                finish(node, lambda: _execute(node))
+            else:
+                running[pool.submit(_execute, node)] = node
+
+    def finish(node: Node, result: Callable[[], float]) -> None:
+        try:
+            seconds = result()
+        except Exception:
+            traceback.print_exc()
+            settle(node, "failed")
+            return
+        absent = missing(node.outputs)
+        if absent:
+            settle(node, "failed", f"did not write {', '.join(absent)}")
+            return
+        cache[node.name] = {
+            "inputs": digest(node, node.inputs + node.optional, True),
+            "outputs": digest(node, node.outputs, False),
+        }
+        settle(node, "built", f"{seconds:.2f}s")
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            schedule(pool)
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(running.pop(future), future.result)
+                schedule(pool)
+    else:
+        while pending:
+            before = len(pending)
+            schedule(None)
+            if len(pending) == before:
+                break
+
+    if not dry_run:
+        write_if_changed(CACHE, json.dumps(cache, indent=2, sort_keys=True))
+    return status
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild out-of-date assets from the declared node graph.")
+    parser.add_argument("targets", nargs="*", help="nodes to build (default: all)")
+    parser.add_argument("--jobs", type=int, default=0, help="parallel worker processes (0 = one per CPU, 1 = in-process)")
+    parser.add_argument("--force", action="store_true", help="rebuild selected nodes even if they look up to date")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be built without running anything")
+    parser.add_argument("--list", action="store_true", help="print the node graph and exit")
+    args = parser.parse_args(argv)
+
+    deps = dependencies(NODES)
+    nodes = select(NODES, deps, args.targets)
+    if args.list:
+        for node in nodes:
+            after = f" after {', '.join(sorted(deps[node.name]))}" if deps[node.name] else ""
+            print(f"{node.name} [{node.script}]{after}")
+            for pattern in node.inputs:
+                print(f"    < {pattern}")
+            for pattern in node.optional:
+                print(f"    <? {pattern}")
+            for pattern in node.outputs:
+                print(f"    > {pattern}")
+        return 0
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    status = build(nodes, deps, jobs, args.force, args.dry_run)
+    counts = {state: sum(1 for s in status.values() if s == state) for state in dict.fromkeys(status.values())}
+    print(", ".join(f"{n} {state}" for state, n in counts.items()) or "nothing to do")
+    return 1 if "failed" in counts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
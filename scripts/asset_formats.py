@@ -0,0 +1,119 @@
+"""Emit WebP/AVIF siblings for PNG assets when they are meaningfully smaller.
+
+For every PNG a lossless WebP (and, when this Pillow build has AVIF support,
+a 4:4:4 full-range AVIF) is encoded next to it. A variant is kept only if it
+decodes to the same visible pixels and alpha as the PNG and beats the PNG by
+--margin; otherwise any stale copy is removed. The chosen formats, smallest
+first, go to assets/formats.json, keyed by the PNG's path under
+apps/web/public. Nothing in apps/web reads that file yet: the renderer and
+sw.js still request the PNGs, so the variants only take effect once a loader
+picks from formats.json.
+
+    python scripts/asset_formats.py                 # sprite strips + UI icons
+    python scripts/asset_formats.py path/a.png --margin 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, features
+
+from extract_canon_sprites import MANIFEST, ROOT, load_json, write_if_changed
+from pipeline_trace import count, span
+
+
+PUBLIC = ROOT / "apps/web/public"
+FORMATS_MANIFEST = PUBLIC / "assets/formats.json"
+UI_DIR = PUBLIC / "assets/ui"
+
+ENCODERS = {
+    "webp": ("WEBP", {"lossless": True, "quality": 100, "method": 4}),
+    "avif": ("AVIF", {"quality": 100, "subsampling": "4:4:4", "range": "full", "speed": 8}),
+}
+
+
+def available_formats() -> list[str]:
+    return [name for name in ENCODERS if features.check(name)]
+
+
+def max_error(reference: np.ndarray, data: bytes) -> int:
+    """Largest channel error over visible pixels (RGB of fully transparent pixels is ignored)."""
+    decoded = np.asarray(Image.open(io.BytesIO(data)).convert("RGBA")).astype(np.int16)
+    diff = np.abs(decoded - reference)
+    visible = reference[..., 3] > 0
+    alpha_err = int(diff[..., 3].max(initial=0))
+    return max(alpha_err, int(diff[visible].max(initial=0)))
+
+
+def emit_variants(png: Path, formats: list[str], margin: float, avif_max_error: int = 0) -> dict[str, int]:
+    """Write the variants of `png` worth keeping; returns {format: bytes}, smallest first."""
+    png_size = png.stat().st_size
+    with span("load"), Image.open(png) as img:
+        rgba = img.convert("RGBA")
+    count("pixels", rgba.width * rgba.height)
+    reference = np.asarray(rgba).astype(np.int16)
+    chosen = {"png": png_size}
+    for name in formats:
+        fmt, options = ENCODERS[name]
+        buf = io.BytesIO()
+        with span("encode", format=name):
+            rgba.save(buf, fmt, **options)
+        data = buf.getvalue()
+        tolerance = avif_max_error if name == "avif" else 0
+        target = png.with_suffix(f".{name}")
+        if len(data) <= png_size * (1 - margin) and max_error(reference, data) <= tolerance:
+            if not target.exists() or target.read_bytes() != data:
+                with span("save", format=name):
+                    target.write_bytes(data)
+            chosen[name] = len(data)
+            count(f"{name}_bytes_saved", png_size - len(data))
+        elif target.exists():
+            target.unlink()
+    return dict(sorted(chosen.items(), key=lambda kv: kv[1]))
+
+
+def default_targets(manifest: dict) -> list[Path]:
+    strips = [ROOT / entry["output"] for entry in manifest.values()]
+    return strips + sorted(UI_DIR.rglob("*.png"))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Emit WebP/AVIF variants that beat the PNG by a margin.")
+    parser.add_argument("paths", nargs="*", type=Path, help="PNG files (default: canon strips + UI icons)")
+    parser.add_argument("--margin", type=float, default=0.05, help="required saving vs PNG, as a fraction")
+    parser.add_argument("--formats", nargs="+", choices=sorted(ENCODERS), default=available_formats())
+    parser.add_argument(
+        "--avif-max-error",
+        type=int,
+        default=0,
+        help="largest per-channel error accepted from AVIF's YUV round trip (0 = lossless only)",
+    )
+    args = parser.parse_args(argv)
+
+    missing = [name for name in args.formats if not features.check(name)]
+    if missing:
+        raise SystemExit(f"this Pillow build cannot encode: {', '.join(missing)}")
+
+    targets = [p.resolve() for p in args.paths] or default_targets(load_json(MANIFEST))
+    outside = [str(p) for p in targets if not p.is_relative_to(PUBLIC)]
+    if outside:
+        parser.error(f"not under {PUBLIC}: {', '.join(outside)}")
+
+    formats_manifest = load_json(FORMATS_MANIFEST)
+    for png in targets:
+        with span("file", path=png.relative_to(ROOT).as_posix()):
+            chosen = emit_variants(png, args.formats, args.margin, args.avif_max_error)
+        formats_manifest[png.relative_to(PUBLIC).as_posix()] = chosen
+        saved = chosen["png"] - min(chosen.values())
+        print(f"{png.relative_to(ROOT).as_posix()}: {', '.join(f'{k}={v}' for k, v in chosen.items())} (-{saved})")
+
+    write_if_changed(FORMATS_MANIFEST, json.dumps(dict(sorted(formats_manifest.items())), indent=2))
+    print(f"formats: {FORMATS_MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Benchmark the sprite extraction stages on synthetic checkerboard sheets.
+
+Each case renders a sheet of the given size with N blob "sprites" on the
+source's grey checkerboard, then times decode, mask, label, transparent crop,
+pack and encode (png_optimize.canonical_png, which every strip is written
+through). Each stage also runs once more, untimed, under tracemalloc for its
+own peak allocation (Python objects and numpy arrays; Pillow's image buffers
+are not traced). Every case runs in a fresh process, so the process peak RSS
+reported with it covers that case alone. Results are printed as JSON; with a
+stored baseline, any stage slower or hungrier than baseline * (1 + tolerance),
+or a case with a higher peak RSS, fails the run. So does a missing baseline
+or one without an entry for every case run: timings are per machine, so
+record one with --update-baseline before relying on the check.
+
+    python scripts/bench_asset_pipeline.py                     # compare with baseline
+    python scripts/bench_asset_pipeline.py --update-baseline   # record this machine
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from extract_canon_sprites import (
+    ENGINES,
+    checker_mask,
+    checker_mask_np,
+    connected_components,
+    connected_components_np,
+    default_engine,
+    pack_strip,
+    transparent_crop,
+)
+from png_optimize import canonical_png
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BASELINE = Path(__file__).resolve().parent / "bench_baseline.json"
+DEFAULT_CASES = ("512x256:8", "1024x512:24", "2048x1024:64")
+
+
+def parse_case(text: str) -> tuple[int, int, int]:
+    size, _, sprites = text.partition(":")
+    w, _, h = size.partition("x")
+    return int(w), int(h), int(sprites or 8)
+
+
+def synthetic_sheet(width: int, height: int, sprites: int, seed: int = 0) -> bytes:
+    """PNG bytes of a checkerboard sheet with `sprites` opaque colourful blobs."""
+    rng = random.Random(seed)
+    sheet = Image.new("RGB", (width, height), (102, 102, 102))
+    draw = ImageDraw.Draw(sheet)
+    tile = 8
+    for y in range(0, height, tile):
+        for x in range((y // tile) % 2 * tile, width, tile * 2):
+            draw.rectangle((x, y, x + tile - 1, y + tile - 1), fill=(153, 153, 153))
+    cols = max(1, int((sprites * width / height) ** 0.5))
+    rows = -(-sprites // cols)
+    cw, ch = width // cols, height // rows
+    for i in range(sprites):
+        x0 = (i % cols) * cw + cw // 8
+        y0 = (i // cols) * ch + ch // 8
+        x1 = x0 + rng.randint(cw // 2, cw * 3 // 4)
+        y1 = y0 + rng.randint(ch // 2, ch * 3 // 4)
+        draw.ellipse((x0, y0, x1, y1), fill=(rng.randint(200, 255), rng.randint(0, 120), rng.randint(0, 255)))
+        draw.ellipse(((x0 + x1) // 2 - 3, (y0 + y1) // 2 - 3, (x0 + x1) // 2 + 3, (y0 + y1) // 2 + 3), fill=(20, 10, 40))
+    buf = io.BytesIO()
+    sheet.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def peak_rss_kb() -> int | None:
+    """High-water RSS of this whole process so far, not of any one stage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(case: str, engine: str, repeat: int) -> dict:
+    width, height, sprites = parse_case(case)
+    data = synthetic_sheet(width, height, sprites)
+    pixels = width * height
+    stages: dict[str, dict] = {}
+
+    def timed(name: str, fn):
+        best = float("inf")
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        stages[name] = {
+            "seconds": round(best, 6),
+            "pixels_per_second": round(pixels / best) if best > 0 else None,
+            "peak_alloc_kb": peak // 1024,
+        }
+        return result
+
+    sheet = timed("decode", lambda: Image.open(io.BytesIO(data)).convert("RGBA"))
+    if engine == "numpy":
+        mask = timed("mask", lambda: checker_mask_np(sheet))
+        comps = timed("label", lambda: connected_components_np(mask))
+    else:
+        mask = timed("mask", lambda: checker_mask(sheet))
+        comps = timed("label", lambda: connected_components(mask))
+    comps = sorted((c for c in comps if c[0] >= 64), key=lambda c: c[1])
+    frames = timed(
+        "transparent_crop",
+        lambda: [transparent_crop(sheet.crop((x1, y1, x2 + 1, y2 + 1))) for _, x1, y1, x2, y2 in comps],
+    )
+    strip = timed("pack", lambda: pack_strip(frames, 128))
+    timed("encode", lambda: len(canonical_png(strip)))
+    return {
+        "case": case,
+        "engine": engine,
+        "pixels": pixels,
+        "components": len(comps),
+        "peak_rss_kb": peak_rss_kb(),
+        "stages": stages,
+    }
+
+
+def _run_case_worker(args: tuple[str, str, int]) -> dict:
+    return run_case(*args)
+
+
+def load_baseline(path: Path) -> dict:
+    """The stored baseline, {"engine/case": result}; exits with a message if the file has another shape."""
+    if not path.exists():
+        return {}
+    try:
+        baseline = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise SystemExit(f"{path}: not JSON ({e})")
+    if not isinstance(baseline, dict) or not all(
+        isinstance(ref, dict) and isinstance(ref.get("stages"), dict) for ref in baseline.values()
+    ):
+        raise SystemExit(f"{path}: not a baseline (expected {{\"engine/case\": result}}; an --output report is a list)")
+    return baseline
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    failures = []
+    for result in results:
+        name = f"{result['engine']}/{result['case']}"
+        ref = baseline.get(name)
+        if not ref:
+            continue
+        if result["peak_rss_kb"] and ref.get("peak_rss_kb"):
+            mem_limit = ref["peak_rss_kb"] * (1 + tolerance)
+            if result["peak_rss_kb"] > mem_limit:
+                failures.append(f"{name}: process peak RSS {result['peak_rss_kb']}KB > {mem_limit:.0f}KB")
+        for stage, now in result["stages"].items():
+            then = ref["stages"].get(stage)
+            if not then:
+                continue
+            # Sub-millisecond stages are all noise; give them a floor.
+            limit = max(then["seconds"], 0.001) * (1 + tolerance)
+            if now["seconds"] > limit:
+                failures.append(f"{name} {stage}: {now['seconds']:.4f}s > {limit:.4f}s")
+            # Same floor idea: a few KB of bookkeeping is not a regression.
+            if then.get("peak_alloc_kb") is not None:
+                mem_limit = max(then["peak_alloc_kb"], 64) * (1 + tolerance)
+                if now["peak_alloc_kb"] > mem_limit:
+                    failures.append(f"{name} {stage}: peak allocation {now['peak_alloc_kb']}KB > {mem_limit:.0f}KB")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the sprite pipeline stages on synthetic sheets.")
+    parser.add_argument("--cases", nargs="+", default=list(DEFAULT_CASES), help="WIDTHxHEIGHT:SPRITES")
+    parser.add_argument("--engine", choices=ENGINES, default=default_engine())
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--output", type=Path, help="also write the JSON report here")
+    args = parser.parse_args(argv)
+    baseline = load_baseline(args.baseline)  # a malformed file fails before the slow part
+
+    # maxtasksperchild=1: every case starts from a clean process, so RSS peaks don't leak across cases.
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        results = pool.map(_run_case_worker, [(case, args.engine, args.repeat) for case in args.cases], chunksize=1)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+
+    if args.update_baseline:
+        baseline.update({f"{r['engine']}/{r['case']}": r for r in results})
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"baseline updated: {args.baseline}", file=sys.stderr)
+        return 0
+
+    unknown = [f"{r['engine']}/{r['case']}" for r in results if f"{r['engine']}/{r['case']}" not in baseline]
+    if unknown:
+        print(
+            f"no baseline for {', '.join(unknown)} in {args.baseline}; run with --update-baseline to record one",
+            file=sys.stderr,
+        )
+        return 1
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image
+
+from extract_canon_sprites import MANIFEST, OUT_ROOT, ROOT, SPECS, load_json, write_if_changed
+from pipeline_trace import count, span
+from png_optimize import save_png
+
+
+PUBLIC = ROOT / "apps/web/public"
+OUT_DIR = PUBLIC / "assets/sprites/atlas"
+# Frame slots start on and span multiples of ALIGN pixels, so a 1/ALIGN
+# downscale of a page (sprite_variants.py) maps every target pixel to source
+# pixels of one slot only and frames keep integer rects.
+ALIGN = 2
+
+
+@dataclass
+class Skyline:
+    """Bottom-left skyline bin packer for one atlas page."""
+
+    width: int
+    height: int
+    # (x, y, w) segments covering [0, width) left to right.
+    segments: list[tuple[int, int, int]] = field(default_factory=list)
+    used_w: int = 0
+    used_h: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.segments:
+            self.segments = [(0, 0, self.width)]
+
+    def _fit(self, index: int, w: int, h: int) -> int | None:
+        x = self.segments[index][0]
+        if x + w > self.width:
+            return None
+        y = 0
+        remaining = w
+        i = index
+        while remaining > 0:
+            _, sy, sw = self.segments[i]
+            y = max(y, sy)
+            if y + h > self.height:
+                return None
+            remaining -= sw
+            i += 1
+        return y
+
+    def insert(self, w: int, h: int) -> tuple[int, int] | None:
+        best: tuple[int, int, int] | None = None  # (top, x, index)
+        for i in range(len(self.segments)):
+            y = self._fit(i, w, h)
+            if y is None:
+                continue
+            candidate = (y + h, self.segments[i][0], i)
+            if best is None or candidate < best:
+                best = candidate
+        if best is None:
+            return None
+        top, x, index = best
+        y = top - h
+        self._raise(index, x, top, w)
+        self.used_w = max(self.used_w, x + w)
+        self.used_h = max(self.used_h, top)
+        return x, y
+
+    def _raise(self, index: int, x: int, top: int, w: int) -> None:
+        end = x + w
+        kept = self.segments[:index]
+        kept.append((x, top, w))
+        for sx, sy, sw in self.segments[index:]:
+            if sx + sw <= end:
+                continue
+            if sx < end:
+                sw -= end - sx
+                sx = end
+            kept.append((sx, sy, sw))
+        merged: list[tuple[int, int, int]] = []
+        for seg in kept:
+            if merged and merged[-1][1] == seg[1]:
+                px, py, pw = merged[-1]
+                merged[-1] = (px, py, pw + seg[2])
+            else:
+                merged.append(seg)
+        self.segments = merged
+
+
+def load_manifest(path: Path = MANIFEST) -> dict:
+    """The extractor's manifest, or the committed padded strips of SPECS when it has not run here."""
+    manifest = load_json(path)
+    if manifest:
+        return manifest
+    return {
+        spec.key: {
+            "output": (OUT_ROOT / spec.folder / spec.filename).relative_to(ROOT).as_posix(),
+            "frames": spec.frames,
+            "frame_size": spec.frame_size,
+        }
+        for spec in SPECS
+    }
+
+
+def load_frames(manifest: dict) -> dict[str, list[tuple[Image.Image, dict]]]:
+    """Slice every strip into frames, each paired with its logical placement.
+
+    Trimmed strips (extract_canon_sprites.py --trim) carry per-frame rects; padded
+    strips are plain frame_size cells.
+    """
+    frames: dict[str, list[tuple[Image.Image, dict]]] = {}
+    for key, entry in manifest.items():
+        size = entry["frame_size"]
+        strip = Image.open(ROOT / entry["output"]).convert("RGBA")
+        if entry.get("trimmed"):
+            frames[key] = [
+                (
+                    strip.crop((x, y, x + w, y + h)),
+                    {"offsetX": fr["offset"][0], "offsetY": fr["offset"][1], "sourceW": fr["size"][0], "sourceH": fr["size"][1]},
+                )
+                for fr in entry["frame_rects"]
+                for x, y, w, h in [fr["rect"]]
+            ]
+        else:
+            frames[key] = [(strip.crop((i * size, 0, (i + 1) * size, size)), {}) for i in range(entry["frames"])]
+    return frames
+
+
+def _aligned(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def pack_group(page: Skyline, images: list[Image.Image], padding: int) -> list[tuple[int, int]] | None:
+    """Place all of `images` on `page`, or leave the page untouched and return None."""
+    trial = Skyline(page.width, page.height, list(page.segments), page.used_w, page.used_h)
+    order = sorted(range(len(images)), key=lambda i: (-images[i].height, -images[i].width, i))
+    positions: list[tuple[int, int]] = [(0, 0)] * len(images)
+    for i in order:
+        pos = trial.insert(_aligned(images[i].width + padding), _aligned(images[i].height + padding))
+        if pos is None:
+            return None
+        positions[i] = pos
+    page.segments, page.used_w, page.used_h = trial.segments, trial.used_w, trial.used_h
+    return positions
+
+
+def build_atlas(manifest: dict, out_dir: Path, max_size: int, padding: int) -> dict:
+    with span("load", sprites=len(manifest)):
+        frames = load_frames(manifest)
+    pages: list[Skyline] = []
+    # Per page: frame digest -> placement, so identical frames (e.g. FLAN_ADULT and
+    # BAGEL share a source box) are stored once per page.
+    stored: list[dict[str, tuple[int, int, Image.Image]]] = []
+
+    sprites = {}
+    order = sorted(frames, key=lambda k: (-max(f.height for f, _ in frames[k]), k))
+    with span("pack", max_size=max_size):
+        for key in order:
+            images = [img for img, _ in frames[key]]
+            digests = [hashlib.sha256(img.tobytes()).hexdigest() for img in images]
+            for img in images:
+                if img.width + padding > max_size or img.height + padding > max_size:
+                    raise ValueError(f"{key}: frame {img.size} does not fit in a {max_size}px atlas")
+
+            # Keep each sprite on one page so the renderer needs a single texture.
+            for page_index in [*range(len(pages)), len(pages)]:
+                if page_index == len(pages):
+                    pages.append(Skyline(max_size, max_size))
+                    stored.append({})
+                known = stored[page_index]
+                missing = list(dict.fromkeys(d for d in digests if d not in known))
+                new_images = [images[digests.index(d)] for d in missing]
+                positions = pack_group(pages[page_index], new_images, padding)
+                if positions is not None:
+                    break
+            if positions is None:
+                raise RuntimeError(f"{key}: frames do not fit on one {max_size}px atlas; raise --max-size")
+            for d, img, (x, y) in zip(missing, new_images, positions):
+                known[d] = (x, y, img)
+
+            sprites[key] = {
+                "atlas": page_index,
+                "gridSize": manifest[key]["frame_size"],
+                "frames": [
+                    {"x": known[d][0], "y": known[d][1], "w": known[d][2].width, "h": known[d][2].height, **trim}
+                    for d, (_, trim) in zip(digests, frames[key])
+                ],
+            }
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atlases = []
+    for i, (page, known) in enumerate(zip(pages, stored)):
+        canvas = Image.new("RGBA", (max(1, page.used_w - padding), max(1, page.used_h - padding)), (0, 0, 0, 0))
+        for x, y, img in known.values():
+            canvas.paste(img, (x, y))
+        path = out_dir / f"atlas_{i}.png"
+        with span("save", atlas=i):
+            save_png(canvas, path)
+        count("atlas_pixels", canvas.width * canvas.height)
+        atlases.append(
+            {
+                "src": path.relative_to(PUBLIC).as_posix(),
+                "width": canvas.width,
+                "height": canvas.height,
+            }
+        )
+        print(f"atlas {i}: {canvas.width}x{canvas.height} -> {path}")
+
+    total = sum(len(images) for images in frames.values())
+    unique = sum(len(known) for known in stored)
+    count("frames", total)
+    count("frames_stored", unique)
+    print(f"{total} frames ({unique} stored) packed into {len(atlases)} atlas(es)")
+    return {"atlases": atlases, "sprites": {key: sprites[key] for key in manifest}}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pack the canon sprite strips into texture atlases.")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="canon_extract_manifest.json")
+    parser.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    parser.add_argument("--max-size", type=int, default=2048, help="maximum atlas width/height in pixels")
+    parser.add_argument(
+        "--padding", type=int, default=ALIGN, help=f"transparent gap between frames (keep it >= {ALIGN} for 0.5x variants)"
+    )
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(args.manifest)
+    frame_map = build_atlas(manifest, args.out_dir, args.max_size, args.padding)
+    map_path = args.out_dir / "atlas.json"
+    if write_if_changed(map_path, json.dumps(frame_map, indent=2)):
+        print(f"frame map: {map_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from PIL import Image
 import os
+from pathlib import Path
 
-assets_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets"
+from validate_assets import read_header
+
+assets_dir = Path(__file__).resolve().parents[1] / "apps/web/public/assets"
 files = ["flan_bebe_v3.png", "flan_bebe_v2.png", "tamagotchi_spritesheet_1768544718465.png"]
 
 print(f"Checking assets in {assets_dir}")
@@ -9,8 +11,8 @@ for f in files:
     path = os.path.join(assets_dir, f)
     if os.path.exists(path):
         try:
-            with Image.open(path) as img:
-                print(f"{f}: {img.size} mode={img.mode}")
+            header = read_header(path)
+            print(f"{f}: {(header.width, header.height)} mode={header.mode}")
         except Exception as e:
             print(f"{f}: Error {e}")
     else:
@@ -0,0 +1,99 @@
+"""Prove the numpy and pure-Python extract engines agree.
+
+    python scripts/check_extract_parity.py
+    python -m pytest scripts/test_extract_parity.py   # the same checks as tests
+
+Labels random masks with both engines, then extracts every SPECS region of
+the master sheet with both. Exit status 0 means both checks passed, 1 that
+something differs, and 2 that the labels matched but the manifest check was
+skipped because the master sheet is not in the checkout.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from extract_canon_sprites import (
+    SOURCE,
+    SPECS,
+    connected_components,
+    connected_components_np,
+    extract_region,
+    np,
+)
+
+
+def random_masks(count: int, seed: int) -> list[list[list[int]]]:
+    rng = random.Random(seed)
+    masks = []
+    for _ in range(count):
+        w = rng.randint(1, 48)
+        h = rng.randint(1, 48)
+        density = rng.random()
+        masks.append([[1 if rng.random() < density else 0 for _ in range(w)] for _ in range(h)])
+    return masks
+
+
+def check_labeling(count: int, seed: int) -> int:
+    failures = 0
+    for i, mask in enumerate(random_masks(count, seed)):
+        expected = connected_components(mask)
+        got = connected_components_np(np.array(mask, dtype=bool))
+        if got != expected:
+            failures += 1
+            print(f"mask #{i} ({len(mask[0])}x{len(mask)}): labeling differs")
+    print(f"labeling: {count - failures}/{count} random masks identical")
+    return failures
+
+
+def check_manifest(source_path: Path) -> int:
+    source = Image.open(source_path).convert("RGBA")
+    failures = 0
+    for spec in SPECS:
+        py_strip, py_entry = extract_region(source, spec, "python")
+        np_strip, np_entry = extract_region(source, spec, "numpy")
+        if py_entry != np_entry:
+            failures += 1
+            print(f"{spec.key}: manifest entries differ")
+        elif py_strip.tobytes() != np_strip.tobytes():
+            failures += 1
+            print(f"{spec.key}: strip pixels differ")
+        else:
+            print(f"{spec.key}: identical")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prove the numpy and pure-Python extract engines agree.")
+    parser.add_argument("--source", type=Path, default=SOURCE, help="master sprite sheet")
+    parser.add_argument("--masks", type=int, default=200, help="random masks for the labeling check")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("numpy is not installed; nothing to compare")
+        return 1
+
+    failures = check_labeling(args.masks, args.seed)
+    skipped = not args.source.exists()
+    if skipped:
+        print(f"manifest parity: SKIPPED, source not found: {args.source}")
+    else:
+        failures += check_manifest(args.source)
+
+    if failures:
+        print(f"PARITY FAILED ({failures})")
+        return 1
+    if skipped:
+        print("PARITY INCOMPLETE (labeling OK, manifest SKIPPED)")
+        return 2
+    print("PARITY OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
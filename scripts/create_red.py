@@ -1,8 +1,10 @@
 from PIL import Image
 
+from png_optimize import save_png
+
 def create_red_square(path):
     img = Image.new('RGBA', (160, 40), color='red')
-    img.save(path)
+    save_png(img, path)
     print(f"Saved red square to {path}")
 
 if __name__ == "__main__":
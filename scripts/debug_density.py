@@ -1,47 +1,49 @@
-from PIL import Image
 import os
 import shutil
+from pathlib import Path
 
-source_path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_clean.png"
-output_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\debug_frames"
+from decode_cache import open_cached
+from grid_detect import detect_or_uniform
+from png_optimize import save_png
 
-if os.path.exists(output_dir):
-    shutil.rmtree(output_dir)
-os.makedirs(output_dir)
+ROOT = Path(__file__).resolve().parents[1]
+source_path = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
+output_dir = ROOT / "debug_frames"
 
 def analyze():
-    if not os.path.exists(source_path):
+    if not source_path.exists():
         print("Source not found")
         return
 
-    img = Image.open(source_path)
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    output_dir.mkdir()
+
+    img = open_cached(source_path)
     print(f"Image Size: {img.size}")
 
-    # Try 40x40 grid
-    grid_size = 40
-    rows = img.height // grid_size
-    cols = img.width // grid_size
+    # Detect the grid; the strips are 40x40 cells when nothing clean shows up
+    grid = detect_or_uniform(img, max(1, img.width // 40), max(1, img.height // 40))
+    cell = grid.cell_size or "uneven"
 
-    print(f"Slicing into {rows}x{cols} grid (cell size {grid_size})")
+    print(f"Slicing into {grid.rows}x{grid.cols} grid (cell size {cell})")
 
     count = 0
-    for r in range(rows):
-        for c in range(cols):
-            left = c * grid_size
-            upper = r * grid_size
-            crop = img.crop((left, upper, left + grid_size, upper + grid_size))
-
-            # Check if empty
-            bbox = crop.getbbox()
-            if bbox:
-                filename = f"f_{r}_{c}.png"
-                crop.save(os.path.join(output_dir, filename))
-                print(f"Saved {filename} (non-empty) at {r},{c}")
-                count += 1
-            else:
-                pass # empty
-
-    print(f"Found {count} non-empty frames of {grid_size}x{grid_size}")
+    for frame in grid.frames:
+        r, c = frame.row, frame.col
+        crop = img.crop(frame.box)
+
+        # Check if empty
+        bbox = crop.getbbox()
+        if bbox:
+            filename = f"f_{r}_{c}.png"
+            save_png(crop, os.path.join(output_dir, filename))
+            print(f"Saved {filename} (non-empty) at {r},{c}")
+            count += 1
+        else:
+            pass # empty
+
+    print(f"Found {count} non-empty frames (cell size {cell})")
 
 if __name__ == "__main__":
     analyze()
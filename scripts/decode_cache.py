@@ -0,0 +1,173 @@
+"""Decoded-pixel cache: images inflated once to raw .npy planes, then memory-mapped.
+
+A source image is keyed by the SHA-256 of its file bytes, so an edited file
+gets a fresh entry and an unchanged one is never decoded again. Under
+scripts/.cache/decoded/ each image has a small <sha>.json header (format,
+mode, size) and one <sha>.<MODE>.npy uint8 array per mode it was asked for.
+np.load(mmap_mode="r") maps them without reading, so a crop only pages in the
+rows it covers and peak memory follows the region, not the sheet.
+
+index.json maps each source path to the digest it was last decoded at; when
+a path comes back with new bytes, the entries of its previous digest are
+deleted (unless another path still has that digest), so re-exporting the
+master sheet does not leave a full-size .npy behind every time.
+
+    sheet = open_sheet(path)          # MappedSheet; .crop(box) -> small RGBA Image
+    pixels = load_rgba(path)          # read-only (H, W, 4) memmap
+    img = open_cached(path)           # PIL Image in the file's own mode, no PNG inflate
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache/decoded"
+INDEX = CACHE_DIR / "index.json"
+# Rows converted per step while filling a new entry.
+BAND_ROWS = 256
+# Modes stored as-is; anything else (P, I;16, CMYK, ...) is cached as RGBA.
+CHANNELS = {"L": 1, "LA": 2, "RGB": 3, "RGBA": 4}
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(path: Path, mode: str = "RGBA", digest: str | None = None) -> Path:
+    return CACHE_DIR / f"{digest or file_sha256(path)}.{mode}.npy"
+
+
+def _write_atomic(target: Path, write) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, target)  # atomic, so concurrent runs never see a half-written entry
+
+
+def _remember(path: Path, digest: str) -> None:
+    """Record `path` at `digest` in the index and drop the entries of the digest it replaces."""
+    key = str(path.resolve())
+    try:
+        index = json.loads(INDEX.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+    previous = index.get(key)
+    if previous == digest:
+        return
+    index[key] = digest
+    if previous and previous not in index.values():
+        for stale in CACHE_DIR.glob(f"{previous}.*"):
+            try:
+                stale.unlink()
+            except OSError:  # still mapped by another process (Windows); left behind
+                pass
+    _write_atomic(INDEX, lambda tmp: tmp.write_text(json.dumps(index, indent=2), encoding="utf-8"))
+
+
+def image_header(path: Path, digest: str | None = None) -> dict:
+    """{"format", "mode", "size"} of the source file, read once and cached next to the pixels."""
+    digest = digest or file_sha256(path)
+    target = CACHE_DIR / f"{digest}.json"
+    try:
+        return json.loads(target.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    with Image.open(path) as img:  # header only; nothing is inflated here
+        header = {"format": img.format, "mode": img.mode, "size": list(img.size)}
+    _write_atomic(target, lambda tmp: tmp.write_text(json.dumps(header), encoding="utf-8"))
+    return header
+
+
+def decode_to_cache(path: Path, mode: str = "RGBA", digest: str | None = None) -> Path:
+    """Decode `path` into its `mode` cache entry (if missing) and return the entry's path."""
+    digest = digest or file_sha256(path)
+    target = cache_path(path, mode, digest)
+    if target.exists():
+        _remember(path, digest)
+        return target
+
+    def write(tmp: Path) -> None:
+        with Image.open(path) as img:
+            img.load()
+            w, h = img.size
+            shape = (h, w) if CHANNELS[mode] == 1 else (h, w, CHANNELS[mode])
+            with open(tmp, "wb") as fh:
+                np.lib.format.write_array_header_1_0(
+                    fh, {"descr": "|u1", "fortran_order": False, "shape": shape}
+                )
+                # Convert band by band so the only full-size buffer is the
+                # decoded image, never an extra converted copy.
+                for y in range(0, h, BAND_ROWS):
+                    band = img.crop((0, y, w, min(h, y + BAND_ROWS)))
+                    fh.write(np.asarray(band.convert(mode) if band.mode != mode else band).tobytes())
+
+    _write_atomic(target, write)
+    _remember(path, digest)
+    return target
+
+
+def load_rgba(path: Path) -> np.memmap:
+    """Read-only (H, W, 4) uint8 view of the decoded image, decoding on first use."""
+    return np.load(decode_to_cache(Path(path)), mmap_mode="r")
+
+
+def open_cached(path: Path) -> Image.Image:
+    """The image as PIL would open it, built from the cached raw planes instead of the PNG.
+
+    The mode is the file's own when it is L/LA/RGB/RGBA (so getbbox, getpixel
+    and getcolors behave exactly as on the original), else RGBA. L and RGBA
+    are mapped without a copy; other modes are unpacked from the raw bytes.
+    """
+    path = Path(path)
+    digest = file_sha256(path)
+    header = image_header(path, digest)
+    mode = header["mode"] if header["mode"] in CHANNELS else "RGBA"
+    pixels = np.load(decode_to_cache(path, mode, digest), mmap_mode="r")
+    img = Image.frombuffer(mode, tuple(header["size"]), pixels, "raw", mode, 0, 1)
+    img.format = header["format"]
+    return img
+
+
+class MappedSheet:
+    """The slice of the Image API the extractors use, backed by a decoded-pixel memmap."""
+
+    def __init__(self, pixels: np.ndarray, cache_file: Path | None = None) -> None:
+        self.pixels = pixels
+        self.cache_file = cache_file
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def crop(self, box: tuple[int, int, int, int]) -> Image.Image:
+        """Like Image.crop: copies only the box, zero-padding anything outside the sheet."""
+        x1, y1, x2, y2 = box
+        out = np.zeros((max(0, y2 - y1), max(0, x2 - x1), 4), dtype=np.uint8)
+        sx1, sy1 = max(0, x1), max(0, y1)
+        sx2, sy2 = min(self.width, x2), min(self.height, y2)
+        if sx2 > sx1 and sy2 > sy1:
+            out[sy1 - y1 : sy2 - y1, sx1 - x1 : sx2 - x1] = self.pixels[sy1:sy2, sx1:sx2]
+        return Image.fromarray(out)
+
+
+def open_sheet(path: Path) -> MappedSheet:
+    entry = decode_to_cache(Path(path), "RGBA")
+    return MappedSheet(np.load(entry, mmap_mode="r"), entry)
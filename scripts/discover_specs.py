@@ -0,0 +1,255 @@
+"""Propose the SPECS table of extract_canon_sprites.py from the master sheet itself.
+
+The whole sheet is masked and labeled once. Components big enough to be
+sprites are grouped into rows (vertically overlapping components) and each
+row is split into lines wherever the horizontal gap is clearly wider than
+the gaps between frames. Every group becomes a proposed RegionSpec: its
+padded bounding box and one frame per component.
+
+Proposals are named after the current spec whose sprites they contain, so
+the output reads as a diff: moved boxes, changed frame counts, specs that
+share a group (two keys cutting the same sprites), specs with nothing in
+them and groups no spec covers yet.
+
+    python scripts/discover_specs.py                 # diff + proposed table
+    python scripts/discover_specs.py --json > specs.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+
+import numpy as np
+
+from bg_remove import checker_mask
+from decode_cache import BAND_ROWS, open_sheet
+from extract_canon_sprites import SOURCE, SPECS, Component, RegionSpec, connected_components_np
+from pipeline_trace import count, span
+
+
+@dataclass(frozen=True)
+class Group:
+    row: int
+    line: int
+    components: tuple[Component, ...]  # left-to-right, sheet coordinates
+
+    @property
+    def bbox(self) -> tuple[int, int, int, int]:
+        """Inclusive (minx, miny, maxx, maxy) over all members."""
+        return (
+            min(c[1] for c in self.components),
+            min(c[2] for c in self.components),
+            max(c[3] for c in self.components),
+            max(c[4] for c in self.components),
+        )
+
+
+def label_sheet(path: Path, min_area: int) -> tuple[tuple[int, int], list[Component]]:
+    """Size of the sheet and its sprite-sized components, from one whole-sheet pass."""
+    with span("load", path=str(path)):
+        sheet = open_sheet(path)
+    with span("mask"):
+        # Band by band off the memmap, so only the boolean mask is sheet-sized.
+        mask = np.empty((sheet.height, sheet.width), dtype=bool)
+        for y in range(0, sheet.height, BAND_ROWS):
+            mask[y : y + BAND_ROWS] = ~checker_mask(sheet.pixels[y : y + BAND_ROWS])
+    with span("label"):
+        comps = connected_components_np(mask)
+    count("pixels", sheet.width * sheet.height)
+    comps = [c for c in comps if c[0] >= min_area]
+    count("components", len(comps))
+    return sheet.size, comps
+
+
+def rows_of(comps: list[Component]) -> list[list[Component]]:
+    """Bands of components whose vertical extents overlap, top to bottom."""
+    rows: list[list[Component]] = []
+    bottom = -1
+    for comp in sorted(comps, key=lambda c: (c[2], c[1])):
+        if rows and comp[2] <= bottom:
+            rows[-1].append(comp)
+            bottom = max(bottom, comp[4])
+        else:
+            rows.append([comp])
+            bottom = comp[4]
+    return rows
+
+
+def lines_of(row: list[Component], min_gap: int, gap_factor: float) -> list[list[Component]]:
+    """Split a row where a gap is well above the frame spacing on either side of it.
+
+    Lines on the sheet use different frame pitches, so each gap is compared
+    with its neighbours rather than with one row-wide figure.
+    """
+    row = sorted(row, key=lambda c: c[1])
+    gaps = []
+    right = row[0][3]
+    for comp in row[1:]:
+        gaps.append(comp[1] - right - 1)
+        right = max(right, comp[3])
+    lines = [[row[0]]]
+    for i, comp in enumerate(row[1:]):
+        around = gaps[max(0, i - 1) : i] + gaps[i + 1 : i + 2]
+        if around and gaps[i] > min_gap and gaps[i] > gap_factor * min(around):
+            lines.append([comp])
+        else:
+            lines[-1].append(comp)
+    return lines
+
+
+def group(comps: list[Component], min_gap: int, gap_factor: float) -> list[Group]:
+    return [
+        Group(r, l, tuple(members))
+        for r, row in enumerate(rows_of(comps))
+        for l, members in enumerate(lines_of(row, min_gap, gap_factor))
+    ]
+
+
+def _inside(comp: Component, spec: RegionSpec) -> bool:
+    cx = (comp[1] + comp[3]) / 2
+    cy = (comp[2] + comp[4]) / 2
+    return spec.x1 <= cx < spec.x2 and spec.y1 <= cy < spec.y2
+
+
+def match(specs: tuple[RegionSpec, ...], groups: list[Group]) -> dict[str, Group | None]:
+    """For each spec, the group holding most of the components centred in its box."""
+    out: dict[str, Group | None] = {}
+    for spec in specs:
+        best, hits = None, 0
+        for g in groups:
+            n = sum(_inside(c, spec) for c in g.components)
+            if n > hits:
+                best, hits = g, n
+        out[spec.key] = best
+    return out
+
+
+def propose(
+    specs: tuple[RegionSpec, ...],
+    groups: list[Group],
+    size: tuple[int, int],
+    margin: int,
+) -> tuple[list[RegionSpec], dict[str, list[str]]]:
+    """Proposed table plus notes: "shared" (spec -> spec it duplicates), "empty", "new".
+
+    Shared and empty specs stay in the table with their current box, so the
+    printed table still has every key SPRITE_CONFIGS and the manifest use.
+    """
+    width, height = size
+    matched = match(specs, groups)
+    owner: dict[Group, str] = {}
+    notes: dict[str, list[str]] = {"shared": [], "empty": [], "new": []}
+    proposed: list[RegionSpec] = []
+
+    def box(g: Group) -> dict:
+        x1, y1, x2, y2 = g.bbox
+        return {
+            "x1": max(0, x1 - margin),
+            "y1": max(0, y1 - margin),
+            "x2": min(width, x2 + 1 + margin),
+            "y2": min(height, y2 + 1 + margin),
+            "frames": len(g.components),
+        }
+
+    for spec in specs:
+        g = matched[spec.key]
+        if g is None:
+            notes["empty"].append(spec.key)
+            proposed.append(spec)
+            continue
+        if g in owner:
+            notes["shared"].append(f"{spec.key} -> {owner[g]}")
+            proposed.append(spec)
+            continue
+        owner[g] = spec.key
+        proposed.append(replace(spec, **box(g)))
+    for g in groups:
+        if g not in owner:
+            key = f"NEW_R{g.row}_L{g.line}"
+            notes["new"].append(key)
+            proposed.append(RegionSpec(key, "new", f"{key.lower()}.png", **box(g)))
+    return proposed, notes
+
+
+def spec_line(spec: RegionSpec, comment: str = "") -> str:
+    extra = ""
+    defaults = RegionSpec("", "", "", 0, 0, 0, 0, 0)
+    if spec.min_area != defaults.min_area:
+        extra += f", min_area={spec.min_area}"
+    if spec.frame_size != defaults.frame_size:
+        extra += f", frame_size={spec.frame_size}"
+    return (
+        f'    RegionSpec("{spec.key}", "{spec.folder}", "{spec.filename}", '
+        f"{spec.x1}, {spec.y1}, {spec.x2}, {spec.y2}, {spec.frames}{extra}),"
+        + (f"  # {comment}" if comment else "")
+    )
+
+
+def comments(notes: dict[str, list[str]]) -> dict[str, str]:
+    """Trailing comment for each spec kept in the table as it was."""
+    out = {key: "empty: no sprite centred in this box" for key in notes["empty"]}
+    for note in notes["shared"]:
+        key, other = note.split(" -> ")
+        out[key] = f"shared: cuts the same sprites as {other}"
+    return out
+
+
+def diff_lines(current: tuple[RegionSpec, ...], proposed: list[RegionSpec], notes: dict[str, list[str]]) -> list[str]:
+    new = {spec.key: spec for spec in proposed}
+    kept = comments(notes)
+    out = []
+    for spec in current:
+        got = new.get(spec.key)
+        if got is None or spec.key in kept:
+            continue
+        old_box = (spec.x1, spec.y1, spec.x2, spec.y2)
+        new_box = (got.x1, got.y1, got.x2, got.y2)
+        changes = []
+        if old_box != new_box:
+            changes.append(f"box {old_box} -> {new_box}")
+        if spec.frames != got.frames:
+            changes.append(f"frames {spec.frames} -> {got.frames}")
+        out.append(f"  {spec.key}: {'; '.join(changes) if changes else 'unchanged'}")
+    out += [f"  shared: {note} (same sprites, kept with its current box)" for note in notes["shared"]]
+    out += [f"  empty: {key} (no sprite centred in its box, kept as is)" for key in notes["empty"]]
+    out += [f"  new: {key} {(new[key].x1, new[key].y1, new[key].x2, new[key].y2)}, {new[key].frames} frames" for key in notes["new"]]
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Propose RegionSpec boxes from one whole-sheet labeling pass.")
+    parser.add_argument("--source", type=Path, default=SOURCE, help="master sprite sheet")
+    parser.add_argument("--min-area", type=int, default=min(spec.min_area for spec in SPECS), help="smallest sprite, in pixels")
+    parser.add_argument("--margin", type=int, default=10, help="padding around each proposed box")
+    parser.add_argument("--min-gap", type=int, default=24, help="never split a row at a gap narrower than this")
+    parser.add_argument("--gap-factor", type=float, default=2.0, help="split where a gap exceeds this many times the narrower neighbouring gap")
+    parser.add_argument("--json", action="store_true", help="print the proposal and notes as JSON")
+    args = parser.parse_args(argv)
+
+    size, comps = label_sheet(args.source, args.min_area)
+    groups = group(comps, args.min_gap, args.gap_factor)
+    proposed, notes = propose(SPECS, groups, size, args.margin)
+
+    if args.json:
+        print(json.dumps({"specs": [asdict(spec) for spec in proposed], "notes": notes}, indent=2))
+        return 0
+    print(f"{len(comps)} sprite components in {len(groups)} groups ({len(rows_of(comps))} rows)")
+    print("diff against SPECS:")
+    print("\n".join(diff_lines(SPECS, proposed, notes)))
+    print("\nSPECS: tuple[RegionSpec, ...] = (")
+    kept = comments(notes)
+    folder = None
+    for spec in proposed:
+        if spec.folder != folder:
+            folder = spec.folder
+            print(f"    # {folder}")
+        print(spec_line(spec, kept.get(spec.key, "")))
+    print(")")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,45 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
 from pathlib import Path
 from typing import Iterable
 
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:  # pure-Python engine only
+    np = None
+
+if np is not None:
+    # Outside the try: these need numpy too, and a broken sibling must fail
+    # loudly instead of quietly dropping back to the pure-Python engine.
+    import bg_remove
+    import pixel_scale
+    from decode_cache import MappedSheet, open_sheet
+    from png_optimize import save_png
+
+from pipeline_trace import count, span
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SOURCE = ROOT / "apps/web/public/Sprites/Sprite definitivo.png"
 OUT_ROOT = ROOT / "apps/web/public/assets/sprites"
 MANIFEST = ROOT / "apps/web/public/assets/sprites/canon_extract_manifest.json"
+CACHE = ROOT / "scripts/.cache/extract_canon_sprites.json"
+# Per-frame rects of --trim strips, keyed like SPRITE_CONFIGS; SpriteConfigs.ts
+# draws those strips through them instead of slicing a fixed grid.
+FRAME_RECTS = ROOT / "apps/web/src/game/renderer/trimmedFrames.json"
+
+# Bump whenever a change here alters the strips produced for unchanged inputs,
+# so the incremental cache does not keep serving stale output.
+SCRIPT_VERSION = 2
 
 
 @dataclass(frozen=True)
@@ -28,6 +56,26 @@ class RegionSpec:
     frame_size: int = 128
 
 
+@dataclass(frozen=True)
+class ExtractOptions:
+    """Output-affecting settings; part of the incremental cache key."""
+
+    # Store only each frame's content bbox instead of a padded frame_size cell.
+    trim: bool = False
+    # How frames are scaled into their cell; see RESAMPLERS.
+    resample: str = "lanczos"
+
+
+Component = tuple[int, int, int, int, int]  # (area, minx, miny, maxx, maxy)
+
+ENGINES = ("numpy", "python")
+# lanczos: smooth, blends new colours in. majority: pixel_scale.downscale,
+# keeps the source palette (needs numpy).
+RESAMPLERS = ("lanczos", "majority")
+
+
+# Hand-measured boxes; after an art update, scripts/discover_specs.py proposes
+# new ones (and a diff against these) from the sheet itself.
 SPECS: tuple[RegionSpec, ...] = (
     # FIU line
     RegionSpec("FIU_EGG", "fiu", "egg.png", 0, 20, 620, 170, 4),
@@ -69,11 +117,15 @@ def is_checker_bg(r: int, g: int, b: int) -> bool:
     return 30 <= r <= 190
 
 
-def connected_components(mask: list[list[int]]) -> list[tuple[int, int, int, int, int]]:
+def default_engine() -> str:
+    return "numpy" if np is not None else "python"
+
+
+def connected_components(mask: list[list[int]]) -> list[Component]:
     h = len(mask)
     w = len(mask[0]) if h else 0
     seen = [[0] * w for _ in range(h)]
-    out: list[tuple[int, int, int, int, int]] = []
+    out: list[Component] = []
 
     for y in range(h):
         for x in range(w):
@@ -103,7 +155,7 @@ def connected_components(mask: list[list[int]]) -> list[tuple[int, int, int, int
     return out
 
 
-def extract_components(region: Image.Image, min_area: int) -> list[tuple[int, int, int, int, int]]:
+def checker_mask(region: Image.Image) -> list[list[int]]:
     rgb = region.convert("RGB")
     w, h = rgb.size
     px = rgb.load()
@@ -114,13 +166,104 @@ def extract_components(region: Image.Image, min_area: int) -> list[tuple[int, in
             r, g, b = px[x, y]
             if not is_checker_bg(r, g, b):
                 row[x] = 1
-    comps = connected_components(mask)
+    return mask
+
+
+def checker_mask_np(region: Image.Image) -> np.ndarray:
+    # Vectorised `not is_checker_bg` over the whole region.
+    return ~bg_remove.checker_mask(np.asarray(region.convert("RGB")))
+
+
+def connected_components_np(mask: np.ndarray) -> list[Component]:
+    """4-connected labeling over horizontal runs instead of pixels.
+
+    Runs are merged with a vectorised hook-and-compress union-find, so every
+    component's root is its first run in raster order. Components come back in
+    the same order and with the same tuples as `connected_components`.
+    """
+    h, w = mask.shape
+    if h == 0 or w == 0:
+        return []
+    padded = np.zeros((h, w + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    run_y, run_x0 = np.nonzero(edges == 1)
+    _, run_x1 = np.nonzero(edges == -1)  # exclusive end
+    n = run_y.size
+    if n == 0:
+        return []
+
+    # Runs in row y+1 touching a run in row y: overlapping [x0, x1) spans.
+    stride = w + 1
+    start_keys = run_y * stride + run_x0
+    end_keys = run_y * stride + run_x1
+    below = np.nonzero(run_y > 0)[0]
+    above_key = (run_y[below] - 1) * stride
+    lo = np.searchsorted(end_keys, above_key + run_x0[below], side="right")
+    hi = np.searchsorted(start_keys, above_key + run_x1[below], side="left")
+    counts = np.maximum(hi - lo, 0)
+    b = np.repeat(below, counts)
+    offsets = np.arange(b.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    a = np.repeat(lo, counts) + offsets
+
+    parent = np.arange(n)
+    while a.size:
+        pa = parent[a]
+        pb = parent[b]
+        if np.array_equal(pa, pb):
+            break
+        low = np.minimum(pa, pb)
+        np.minimum.at(parent, pa, low)
+        np.minimum.at(parent, pb, low)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    roots, label = np.unique(parent, return_inverse=True)
+    k = roots.size
+    area = np.bincount(label, weights=run_x1 - run_x0, minlength=k).astype(np.int64)
+    minx = np.full(k, w, dtype=np.int64)
+    maxx = np.full(k, -1, dtype=np.int64)
+    miny = np.full(k, h, dtype=np.int64)
+    maxy = np.full(k, -1, dtype=np.int64)
+    np.minimum.at(minx, label, run_x0)
+    np.maximum.at(maxx, label, run_x1 - 1)
+    np.minimum.at(miny, label, run_y)
+    np.maximum.at(maxy, label, run_y)
+    return [
+        (int(area[i]), int(minx[i]), int(miny[i]), int(maxx[i]), int(maxy[i]))
+        for i in range(k)
+    ]
+
+
+def extract_components(region: Image.Image, min_area: int, engine: str | None = None) -> list[Component]:
+    engine = engine or default_engine()
+    if engine == "numpy":
+        if np is None:
+            raise RuntimeError("numpy engine requested but numpy is not installed")
+        with span("mask"):
+            mask = checker_mask_np(region)
+        with span("label"):
+            comps = connected_components_np(mask)
+    else:
+        with span("mask"):
+            mask = checker_mask(region)
+        with span("label"):
+            comps = connected_components(mask)
+    count("pixels", region.width * region.height)
     comps = [c for c in comps if c[0] >= min_area]
     comps.sort(key=lambda c: c[1])  # left-to-right
+    count("components", len(comps))
     return comps
 
 
 def transparent_crop(img: Image.Image) -> Image.Image:
+    if np is not None:
+        arr = bg_remove.rgba_array(img)
+        bg_remove.clear(arr, bg_remove.checker_mask(arr))
+        return bg_remove.to_image(arr)
     rgba = img.convert("RGBA")
     px = rgba.load()
     w, h = rgba.size
@@ -134,42 +277,93 @@ def transparent_crop(img: Image.Image) -> Image.Image:
     return rgba
 
 
-def pack_strip(frames: Iterable[Image.Image], frame_size: int) -> Image.Image:
+def fit_frame(frame: Image.Image, frame_size: int, resample: str = "lanczos") -> tuple[Image.Image, int, int] | None:
+    """Scale a frame's content to fit a frame_size cell; returns it with its centred offset."""
+    bbox = frame.getbbox()
+    if not bbox:
+        return None
+    content = frame.crop(bbox)
+    cw, ch = content.size
+    scale = min(frame_size / max(cw, 1), frame_size / max(ch, 1))
+    nw = max(1, int(cw * scale))
+    nh = max(1, int(ch * scale))
+    if resample == "majority":
+        if np is None:
+            raise RuntimeError("majority resampling needs numpy")
+        resized = pixel_scale.downscale(content, (nw, nh))
+    else:
+        resized = content.resize((nw, nh), Image.Resampling.LANCZOS)
+    return resized, (frame_size - nw) // 2, (frame_size - nh) // 2
+
+
+def pack_strip(frames: Iterable[Image.Image], frame_size: int, resample: str = "lanczos") -> Image.Image:
     frames = list(frames)
     out = Image.new("RGBA", (frame_size * len(frames), frame_size), (0, 0, 0, 0))
     for i, frame in enumerate(frames):
-        bbox = frame.getbbox()
-        if not bbox:
+        fitted = fit_frame(frame, frame_size, resample)
+        if not fitted:
             continue
-        content = frame.crop(bbox)
-        cw, ch = content.size
-        scale = min(frame_size / max(cw, 1), frame_size / max(ch, 1))
-        nw = max(1, int(cw * scale))
-        nh = max(1, int(ch * scale))
-        resized = content.resize((nw, nh), Image.Resampling.LANCZOS)
+        resized, ox, oy = fitted
         cell = Image.new("RGBA", (frame_size, frame_size), (0, 0, 0, 0))
-        ox = (frame_size - nw) // 2
-        oy = (frame_size - nh) // 2
         cell.alpha_composite(resized, (ox, oy))
         out.alpha_composite(cell, (i * frame_size, 0))
     return out
 
 
-def main() -> None:
-    source = Image.open(SOURCE).convert("RGBA")
-    manifest: dict[str, dict] = {}
+def pack_strip_trimmed(
+    frames: Iterable[Image.Image], frame_size: int, resample: str = "lanczos"
+) -> tuple[Image.Image, list[dict]]:
+    """Like pack_strip, but each frame keeps only its content bbox.
 
-    for spec in SPECS:
+    Returns the strip plus, per frame, its rect inside the strip, the offset of
+    that rect inside the logical frame_size cell and the cell size, which is
+    what the renderer needs to draw the frame where pack_strip would have put it.
+    """
+    pieces: list[tuple[Image.Image, int, int]] = []
+    for frame in frames:
+        fitted = fit_frame(frame, frame_size, resample)
+        if fitted:
+            resized, ox, oy = fitted
+            bbox = resized.getbbox()
+            if bbox:
+                pieces.append((resized.crop(bbox), ox + bbox[0], oy + bbox[1]))
+                continue
+        pieces.append((Image.new("RGBA", (1, 1), (0, 0, 0, 0)), 0, 0))
+
+    out = Image.new("RGBA", (sum(p.width for p, _, _ in pieces), max(p.height for p, _, _ in pieces)), (0, 0, 0, 0))
+    rects: list[dict] = []
+    x = 0
+    for piece, ox, oy in pieces:
+        out.alpha_composite(piece, (x, 0))
+        rects.append(
+            {
+                "rect": [x, 0, piece.width, piece.height],
+                "offset": [ox, oy],
+                "size": [frame_size, frame_size],
+            }
+        )
+        x += piece.width
+    return out, rects
+
+
+def extract_region(
+    source: Image.Image | MappedSheet,
+    spec: RegionSpec,
+    engine: str | None = None,
+    options: ExtractOptions = ExtractOptions(),
+) -> tuple[Image.Image, dict]:
+    with span("crop"):
         region = source.crop((spec.x1, spec.y1, spec.x2, spec.y2))
-        comps = extract_components(region, spec.min_area)
-        if len(comps) < spec.frames:
-            raise RuntimeError(
-                f"{spec.key}: expected at least {spec.frames} sprite components in region "
-                f"({spec.x1},{spec.y1})-({spec.x2},{spec.y2}), got {len(comps)}"
-            )
-        selected = comps[: spec.frames]
-        frames: list[Image.Image] = []
-        frame_meta: list[dict] = []
+    comps = extract_components(region, spec.min_area, engine)
+    if len(comps) < spec.frames:
+        raise RuntimeError(
+            f"{spec.key}: expected at least {spec.frames} sprite components in region "
+            f"({spec.x1},{spec.y1})-({spec.x2},{spec.y2}), got {len(comps)}"
+        )
+    selected = comps[: spec.frames]
+    frames: list[Image.Image] = []
+    frame_meta: list[dict] = []
+    with span("key_frames", frames=len(selected)):
         for area, x1, y1, x2, y2 in selected:
             pad = 4
             rx1 = max(0, x1 - pad)
@@ -178,6 +372,7 @@ def main() -> None:
             ry2 = min(region.height, y2 + 1 + pad)
             crop = region.crop((rx1, ry1, rx2, ry2))
             frames.append(transparent_crop(crop))
+            count("frame_pixels", crop.width * crop.height)
             frame_meta.append(
                 {
                     "area": area,
@@ -186,24 +381,280 @@ def main() -> None:
                 }
             )
 
-        strip = pack_strip(frames, spec.frame_size)
-        out_dir = OUT_ROOT / spec.folder
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / spec.filename
-        strip.save(out_path)
-
-        manifest[spec.key] = {
-            "output": str(out_path.relative_to(ROOT)),
-            "frames": spec.frames,
-            "frame_size": spec.frame_size,
-            "source_region": [spec.x1, spec.y1, spec.x2, spec.y2],
-            "selected": frame_meta,
+    out_path = OUT_ROOT / spec.folder / spec.filename
+    entry = {
+        "output": str(out_path.relative_to(ROOT)),
+        "frames": spec.frames,
+        "frame_size": spec.frame_size,
+        "source_region": [spec.x1, spec.y1, spec.x2, spec.y2],
+        "selected": frame_meta,
+    }
+    with span("resize", trim=options.trim, resample=options.resample):
+        if options.trim:
+            strip, entry["frame_rects"] = pack_strip_trimmed(frames, spec.frame_size, options.resample)
+            entry["trimmed"] = True
+        else:
+            strip = pack_strip(frames, spec.frame_size, options.resample)
+    return strip, entry
+
+
+def write_region(source: Image.Image | MappedSheet, spec: RegionSpec, engine: str, options: ExtractOptions) -> dict:
+    with span("region", key=spec.key, engine=engine):
+        strip, entry = extract_region(source, spec, engine, options)
+        out_path = ROOT / entry["output"]
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with span("save"):
+            if np is not None:
+                save_png(strip, out_path)
+            else:  # Pillow's encoder; bytes may differ between Pillow versions
+                strip.save(out_path)
+        count("bytes_written", out_path.stat().st_size)
+    print(f"{spec.key}: wrote {out_path}")
+    return entry
+
+
+# Per-worker view of the decoded sheet: the decode-cache memmap when there is
+# one, else a shared-memory copy of the pixels (see run_parallel).
+_shared_source: Image.Image | MappedSheet | None = None
+_shared_block: shared_memory.SharedMemory | None = None
+
+
+def _attach_source(name: str, size: tuple[int, int]) -> None:
+    global _shared_source, _shared_block
+    _shared_block = shared_memory.SharedMemory(name=name)
+    _shared_source = Image.frombuffer("RGBA", size, _shared_block.buf, "raw", "RGBA", 0, 1)
+
+
+def _attach_mapped(cache_file: str) -> None:
+    global _shared_source
+    _shared_source = MappedSheet(np.load(cache_file, mmap_mode="r"), Path(cache_file))
+
+
+def _write_region_shared(spec: RegionSpec, engine: str, options: ExtractOptions) -> dict:
+    assert _shared_source is not None
+    return write_region(_shared_source, spec, engine, options)
+
+
+def _collect(futures: dict, specs: list[RegionSpec], into: dict[str, dict]) -> dict[str, dict]:
+    """Gather every region that finished into `into` (SPECS order), then re-raise the first failure."""
+    error = None
+    for spec in specs:
+        try:
+            into[spec.key] = futures[spec.key].result()
+        except Exception as e:
+            error = error or e
+    if error:
+        raise error
+    return into
+
+
+def run_parallel(
+    source: Image.Image | MappedSheet,
+    specs: Iterable[RegionSpec],
+    engine: str,
+    jobs: int,
+    options: ExtractOptions,
+    into: dict[str, dict] | None = None,
+) -> dict[str, dict]:
+    """Decode once, share the raw RGBA buffer, fan regions out to a process pool.
+
+    Entries land in `into` as they are collected, so a caller whose run raises
+    still sees which regions were written.
+    """
+    specs = list(specs)
+    into = {} if into is None else into
+    if np is not None and isinstance(source, MappedSheet):
+        # Workers map the same cache file; nothing is copied up front.
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_attach_mapped,
+            initargs=(str(source.cache_file),),
+        ) as pool:
+            futures = {spec.key: pool.submit(_write_region_shared, spec, engine, options) for spec in specs}
+            return _collect(futures, specs, into)
+
+    raw = source.tobytes()
+    block = shared_memory.SharedMemory(create=True, size=len(raw))
+    try:
+        block.buf[: len(raw)] = raw
+        del raw
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_attach_source,
+            initargs=(block.name, source.size),
+        ) as pool:
+            futures = {spec.key: pool.submit(_write_region_shared, spec, engine, options) for spec in specs}
+            # Merge in SPECS order regardless of completion order.
+            return _collect(futures, specs, into)
+    finally:
+        block.close()
+        block.unlink()
+
+
+def region_digest(source: Image.Image | MappedSheet, spec: RegionSpec, options: ExtractOptions) -> str:
+    h = hashlib.sha256()
+    h.update(f"v{SCRIPT_VERSION}".encode())
+    h.update(json.dumps(asdict(spec), sort_keys=True).encode())
+    h.update(json.dumps(asdict(options), sort_keys=True).encode())
+    h.update(source.crop((spec.x1, spec.y1, spec.x2, spec.y2)).tobytes())
+    return h.hexdigest()
+
+
+def file_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def frame_rects(manifest: dict) -> dict[str, list[dict]]:
+    """FrameRect lists (SpriteRenderer.ts shape) for every trimmed strip in `manifest`."""
+    return {
+        key: [
+            {
+                "x": x,
+                "y": y,
+                "w": w,
+                "h": h,
+                "offsetX": fr["offset"][0],
+                "offsetY": fr["offset"][1],
+                "sourceW": fr["size"][0],
+                "sourceH": fr["size"][1],
+            }
+            for fr in entry["frame_rects"]
+            for x, y, w, h in [fr["rect"]]
+        ]
+        for key, entry in manifest.items()
+        if entry.get("trimmed")
+    }
+
+
+def write_manifest(manifest: dict) -> None:
+    if write_if_changed(MANIFEST, json.dumps(manifest, indent=2)):
+        print(f"manifest: {MANIFEST}")
+    if write_if_changed(FRAME_RECTS, json.dumps(frame_rects(manifest), indent=2, sort_keys=True) + "\n"):
+        print(f"frame rects: {FRAME_RECTS}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cut the canon sprite strips out of the master sheet.")
+    parser.add_argument("--source", type=Path, default=SOURCE, help="master sprite sheet")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=default_engine(),
+        help="masking/labeling backend (numpy when available, else pure Python)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="worker processes for per-region extraction (0 = one per CPU)",
+    )
+    parser.add_argument("--force", action="store_true", help="ignore the incremental cache and rebuild every region")
+    parser.add_argument(
+        "--no-decode-cache",
+        action="store_true",
+        help="decode the whole sheet in memory instead of memory-mapping scripts/.cache/decoded",
+    )
+    parser.add_argument(
+        "--trim",
+        action="store_true",
+        help="store only each frame's content bbox; rects/offsets go to the manifest and trimmedFrames.json, which SpriteConfigs.ts draws through",
+    )
+    parser.add_argument(
+        "--resample",
+        choices=RESAMPLERS,
+        default="lanczos",
+        help="frame scaling: lanczos (smooth) or majority (crisp, source palette only; needs numpy)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and re-extract only the regions each edit to the sheet touches (needs numpy)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if np is None and (args.watch or args.engine == "numpy"):
+        raise SystemExit(f"{'--watch' if args.watch else '--engine numpy'} needs numpy, which is not installed")
+    with span("load", path=str(args.source)):
+        if np is not None and not args.no_decode_cache:
+            # Regions are cut straight from the memmap, so peak memory tracks
+            # the largest region rather than the sheet.
+            source = open_sheet(args.source)
+        else:
+            source = Image.open(args.source).convert("RGBA")
+    count("source_pixels", source.width * source.height)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    options = ExtractOptions(trim=args.trim, resample=args.resample)
+
+    # A region is clean when its pixels, its spec and SCRIPT_VERSION hash the same
+    # as last time and the strip on disk is still the one we wrote.
+    cache = {} if args.force else load_json(CACHE)
+    previous = load_json(MANIFEST)
+    with span("digest"):
+        digests = {spec.key: region_digest(source, spec, options) for spec in SPECS}
+    dirty = []
+    for spec in SPECS:
+        hit = cache.get(spec.key)
+        entry = previous.get(spec.key)
+        if (
+            hit
+            and entry
+            and hit["input"] == digests[spec.key]
+            and hit["output"] == file_digest(ROOT / entry["output"])
+        ):
+            continue
+        dirty.append(spec)
+
+    with span("extract", regions=len(dirty), jobs=jobs):
+        if jobs > 1 and len(dirty) > 1:
+            fresh = run_parallel(source, dirty, args.engine, jobs, options)
+        else:
+            fresh = {spec.key: write_region(source, spec, args.engine, options) for spec in dirty}
+
+    manifest = {spec.key: fresh.get(spec.key) or previous[spec.key] for spec in SPECS}
+    new_cache = {
+        spec.key: {
+            "input": digests[spec.key],
+            "output": file_digest(ROOT / manifest[spec.key]["output"])
+            if spec.key in fresh
+            else cache[spec.key]["output"],
         }
-        print(f"{spec.key}: wrote {out_path}")
+        for spec in SPECS
+    }
+
+    print(f"{len(dirty)} region(s) rebuilt, {len(SPECS) - len(dirty)} up to date")
+    write_manifest(manifest)
+    write_if_changed(CACHE, json.dumps(new_cache, indent=2))
+
+    if args.watch:
+        # Imported here: sheet_watch builds on this module.
+        from sheet_watch import watch
 
-    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
-    MANIFEST.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
-    print(f"manifest: {MANIFEST}")
+        pixels = np.array(source.pixels) if isinstance(source, MappedSheet) else np.array(source)
+        watch(args.source, pixels, args.engine, jobs, options)
 
 
 if __name__ == "__main__":
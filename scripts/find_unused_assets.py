@@ -0,0 +1,208 @@
+"""Find deployed assets nothing loads, and images that duplicate each other.
+
+Everything under apps/web/public is copied into the build, so every file
+there ships whether or not the game uses it. An asset counts as used when
+its public path (e.g. assets/sprites/fiu/egg.png) appears in the app
+sources (apps/web/src, tests excluded, plus index.html), or in a public
+text file (sw.js, manifest.json, atlas.json, ...) that is itself used.
+Files only read by the build scripts (asset_build.py inputs) are reported
+separately: the deploy does not need them, the pipeline does.
+
+Images are also hashed two ways: their decoded RGBA pixels (identical art
+saved twice, even as different formats) and a 64-bit difference hash of a
+9x8 greyscale thumbnail (near-identical art: re-exports, _v2 edits).
+
+    python scripts/find_unused_assets.py
+    python scripts/find_unused_assets.py --json > unused.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from asset_build import NODES, expand
+from extract_canon_sprites import ROOT
+from png_optimize import pixel_digest
+
+
+PUBLIC = ROOT / "apps/web/public"
+SOURCES = (ROOT / "apps/web/src", ROOT / "apps/web/index.html")
+SOURCE_SUFFIXES = {".ts", ".js", ".css", ".html", ".json"}
+TEXT_SUFFIXES = {".js", ".json", ".webmanifest", ".css", ".html", ".svg"}
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".avif"}
+# Difference-hash bits that may differ for two images to count as near-identical.
+NEAR_BITS = 6
+
+
+@dataclass(frozen=True)
+class Asset:
+    path: str  # relative to apps/web/public, as the app refers to it
+    bytes: int
+    pixels: str | None = None  # sha256 of size + RGBA pixels
+    dhash: int | None = None
+    aspect: float | None = None
+
+
+def source_texts() -> list[str]:
+    files: list[Path] = []
+    for root in SOURCES:
+        if root.is_dir():
+            files.extend(p for p in root.rglob("*") if p.suffix in SOURCE_SUFFIXES)
+        elif root.exists():
+            files.append(root)
+    return [p.read_text(encoding="utf-8", errors="replace") for p in sorted(files) if ".test." not in p.name]
+
+
+def dhash(img: Image.Image) -> int:
+    # Composite onto mid grey so transparent padding hashes the same whatever
+    # colour the invisible pixels happen to hold.
+    rgba = img.convert("RGBA")
+    flat = Image.new("RGBA", rgba.size, (128, 128, 128, 255))
+    flat.alpha_composite(rgba)
+    small = np.asarray(flat.convert("L").resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def load_asset(path: Path) -> Asset:
+    rel = path.relative_to(PUBLIC).as_posix()
+    size = path.stat().st_size
+    if path.suffix.lower() not in IMAGE_SUFFIXES:
+        return Asset(rel, size)
+    try:
+        with Image.open(path) as img:
+            img.load()
+            rgba = img.convert("RGBA")
+    except Exception:
+        return Asset(rel, size)
+    return Asset(rel, size, pixel_digest(rgba), dhash(rgba), rgba.width / rgba.height)
+
+
+def referenced(asset: str, texts: list[str]) -> bool:
+    pattern = re.compile(r"(?<![\w.-])" + re.escape(asset) + r"(?![\w.-])")
+    return any(pattern.search(text) for text in texts)
+
+
+def used_assets(assets: list[Asset]) -> set[str]:
+    """Assets reachable from the sources, following used public text files."""
+    texts = source_texts()
+    used: set[str] = set()
+    while True:
+        found = {a.path for a in assets if a.path not in used and referenced(a.path, texts)}
+        if not found:
+            return used
+        used |= found
+        texts = [
+            (PUBLIC / path).read_text(encoding="utf-8", errors="replace")
+            for path in sorted(found)
+            if Path(path).suffix in TEXT_SUFFIXES
+        ]
+
+
+def build_inputs() -> set[str]:
+    out: set[str] = set()
+    for node in NODES:
+        for pattern in node.inputs:
+            out.update(p.relative_to(PUBLIC).as_posix() for p in expand(pattern) if p.is_relative_to(PUBLIC))
+    return out
+
+
+def _groups(assets: list[Asset], same) -> list[list[Asset]]:
+    parent = list(range(len(assets)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(assets)):
+        for j in range(i + 1, len(assets)):
+            if same(assets[i], assets[j]):
+                parent[find(j)] = find(i)
+    by_root: dict[int, list[Asset]] = {}
+    for i, asset in enumerate(assets):
+        by_root.setdefault(find(i), []).append(asset)
+    return [g for g in by_root.values() if len(g) > 1]
+
+
+def identical(assets: list[Asset]) -> list[list[Asset]]:
+    return _groups([a for a in assets if a.pixels], lambda a, b: a.pixels == b.pixels)
+
+
+def near_identical(assets: list[Asset], bits: int = NEAR_BITS) -> list[list[Asset]]:
+    def close(a: Asset, b: Asset) -> bool:
+        return (
+            a.pixels != b.pixels
+            and abs(a.aspect - b.aspect) <= 0.1 * max(a.aspect, b.aspect)
+            and (a.dhash ^ b.dhash).bit_count() <= bits
+        )
+
+    return _groups([a for a in assets if a.dhash is not None], close)
+
+
+def analyse(bits: int = NEAR_BITS) -> dict:
+    assets = [load_asset(p) for p in sorted(PUBLIC.rglob("*")) if p.is_file()]
+    used = used_assets(assets)
+    inputs = build_inputs()
+    unused = [a for a in assets if a.path not in used]
+
+    # Among used copies of the same pixels, one is enough; point the other
+    # references at it and the rest can go.
+    redundant = []
+    for group in identical(assets):
+        copies = [a for a in group if a.path in used]
+        redundant.extend((a, copies[0]) for a in copies[1:])
+
+    return {
+        "assets": len(assets),
+        "bytes": sum(a.bytes for a in assets),
+        "unused": [
+            {"path": a.path, "bytes": a.bytes, "build_input": a.path in inputs} for a in unused
+        ],
+        "redundant_copies": [{"path": a.path, "bytes": a.bytes, "same_as": keep.path} for a, keep in redundant],
+        "identical": [[a.path for a in group] for group in identical(assets)],
+        "near_identical": [[a.path for a in group] for group in near_identical(assets, bits)],
+        "droppable_bytes": sum(a.bytes for a in unused) + sum(a.bytes for a, _ in redundant),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Report unused and duplicate files in the deployed public/ tree.")
+    parser.add_argument("--near-bits", type=int, default=NEAR_BITS, help="max differing dhash bits for near-identical images")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = analyse(args.near_bits)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['assets']} files in {PUBLIC.relative_to(ROOT)}, {report['bytes']} bytes")
+    print(f"unused ({len(report['unused'])}):")
+    for entry in sorted(report["unused"], key=lambda e: e["bytes"], reverse=True):
+        note = "  (build input)" if entry["build_input"] else ""
+        print(f"  {entry['bytes']:>9}  {entry['path']}{note}")
+    if report["redundant_copies"]:
+        print("used, but pixel-identical to another used file:")
+        for entry in report["redundant_copies"]:
+            print(f"  {entry['bytes']:>9}  {entry['path']}  = {entry['same_as']}")
+    for title, key in (("pixel-identical", "identical"), ("near-identical", "near_identical")):
+        if report[key]:
+            print(f"{title} groups:")
+            for group in report[key]:
+                print(f"  {', '.join(group)}")
+    pct = 100 * report["droppable_bytes"] / report["bytes"] if report["bytes"] else 0.0
+    print(f"droppable from the deploy: {report['droppable_bytes']} bytes ({pct:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
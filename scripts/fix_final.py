@@ -1,28 +1,30 @@
+from pathlib import Path
+
 from PIL import Image
-import os
 
-source_path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_clean.png"
-output_path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_40px.png"
+from pipeline_trace import count, span
+from png_optimize import save_png
 
-def process():
-    if not os.path.exists(source_path):
-        print(f"Source not found: {source_path}")
-        return
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
+OUTPUT = ROOT / "apps/web/public/assets/flan_bebe_40px.png"
 
-    try:
-        with Image.open(source_path) as img:
-            print(f"Source size: {img.size}")
+def process(source_path=SOURCE, output_path=OUTPUT):
+    with Image.open(source_path) as img:
+        with span("load", path=str(source_path)):
+            img.load()
+        count("pixels", img.width * img.height)
+        print(f"Source size: {img.size}")
 
-            # Crop top-left 160x40 area
-            # This contains 4 sprites of 40x40 laid out horizontally
-            crop_rect = (0, 0, 160, 40)
+        # Crop top-left 160x40 area
+        # This contains 4 sprites of 40x40 laid out horizontally
+        crop_rect = (0, 0, 160, 40)
+        with span("crop"):
             strip = img.crop(crop_rect)
 
-            strip.save(output_path)
-            print(f"Saved 160x40 strip to {output_path}")
-
-    except Exception as e:
-        print(f"Error: {e}")
+        with span("save", path=str(output_path)):
+            save_png(strip, output_path)
+        print(f"Saved 160x40 strip to {output_path}")
 
 if __name__ == "__main__":
     process()
@@ -1,82 +1,82 @@
 import sys
-from PIL import Image
-
-def process_image():
-    input_path = 'apps/web/public/assets/flan_bebe_clean.png'
-    output_path = 'apps/web/public/assets/flan_bebe_40px.png' # Overwrite
-
-    try:
-        img = Image.open(input_path).convert("RGBA")
-        width, height = img.size
-        # Source checks
-        num_frames = 4
-        frame_width = width // num_frames
-        frame_height = height
-
-        target_size = 40
-
-        new_img = Image.new("RGBA", (target_size * num_frames, target_size), (0,0,0,0))
-
-        print(f"Processing {num_frames} frames from {width}x{height} image (threshold 200)...")
-
-        for i in range(num_frames):
-            # Extract frame
-            box = (i * frame_width, 0, (i + 1) * frame_width, frame_height)
-            frame = img.crop(box)
-
-            # Aggressive background removal
-            # Remove anything that is vaguely white/gray
-            # R>200, G>200, B>200
+from pathlib import Path
 
-            data = frame.getdata()
-            new_data = []
-
-            # Count removed pixels
-            removed = 0
-
-            for item in data:
-                r, g, b, a = item
-                # Check for white-ish
-                if r > 180 and g > 180 and b > 180:
-                    new_data.append((0,0,0,0))
-                    removed += 1
-                else:
-                    new_data.append(item)
-
-            frame.putdata(new_data)
-
-            # Find content bbox
-            bbox = frame.getbbox()
-
-            if bbox:
-                content = frame.crop(bbox)
-                content_w, content_h = content.size
-
-                # Resize
-                # Maintain aspect ratio
-                scale = min(target_size / content_w, target_size / content_h)
-                new_w = int(content_w * scale)
-                new_h = int(content_h * scale)
+from PIL import Image
 
-                if new_w > 0 and new_h > 0:
-                    content_resized = content.resize((new_w, new_h), Image.Resampling.LANCZOS)
+from bg_remove import border_connected, clear, rgba_array, to_image, white_mask
+from pipeline_trace import count, span
+from png_optimize import save_png
 
-                    # Center
-                    paste_x = (target_size - new_w) // 2
-                    paste_y = (target_size - new_h) // 2
+ROOT = Path(__file__).resolve().parents[1]
+# Alternative cut to fix_final.py (which owns flan_bebe_40px.png); the asset_build node "flan-40px-fit".
+INPUT_PATH = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
+OUTPUT_PATH = ROOT / "apps/web/public/assets/flan_bebe_40px_fit.png"
 
-                    new_img.paste(content_resized, (i * target_size + paste_x, paste_y))
-                    print(f"Frame {i}: Content {content_w}x{content_h} -> {new_w}x{new_h}, pasted at {paste_x},{paste_y}. Removed {removed} pixels.")
-                else:
-                    print(f"Frame {i}: Resized to 0")
+def process_image(input_path=INPUT_PATH, output_path=OUTPUT_PATH, edge_only=False):
+    with span("load", path=str(input_path)):
+        img = Image.open(input_path).convert("RGBA")
+    width, height = img.size
+    count("pixels", width * height)
+    # Source checks
+    num_frames = 4
+    frame_width = width // num_frames
+    frame_height = height
+
+    target_size = 40
+
+    new_img = Image.new("RGBA", (target_size * num_frames, target_size), (0,0,0,0))
+
+    print(f"Processing {num_frames} frames from {width}x{height} image (threshold 200)...")
+
+    for i in range(num_frames):
+        # Extract frame
+        box = (i * frame_width, 0, (i + 1) * frame_width, frame_height)
+        frame = img.crop(box)
+
+        # Aggressive background removal
+        # Remove anything that is vaguely white/gray
+        # R>200, G>200, B>200
+
+        with span("mask", frame=i, edge_only=edge_only):
+            pixels = rgba_array(frame)
+            mask = white_mask(pixels, 180)
+            if edge_only:
+                # Keep white highlights inside the character; only the border-connected backdrop goes
+                mask = border_connected(mask)
+            removed = clear(pixels, mask)
+        count("pixels_cleared", removed)
+        frame = to_image(pixels)
+
+        # Find content bbox
+        bbox = frame.getbbox()
+
+        if bbox:
+            content = frame.crop(bbox)
+            content_w, content_h = content.size
+
+            # Resize
+            # Maintain aspect ratio
+            scale = min(target_size / content_w, target_size / content_h)
+            new_w = int(content_w * scale)
+            new_h = int(content_h * scale)
+
+            if new_w > 0 and new_h > 0:
+                content_resized = content.resize((new_w, new_h), Image.Resampling.LANCZOS)
+
+                # Center
+                paste_x = (target_size - new_w) // 2
+                paste_y = (target_size - new_h) // 2
+
+                new_img.paste(content_resized, (i * target_size + paste_x, paste_y))
+                print(f"Frame {i}: Content {content_w}x{content_h} -> {new_w}x{new_h}, pasted at {paste_x},{paste_y}. Removed {removed} pixels.")
             else:
-                print(f"Frame {i}: Empty after background removal")
-
-        new_img.save(output_path)
-        print(f"Saved to {output_path}")
+                print(f"Frame {i}: Resized to 0")
+        else:
+            print(f"Frame {i}: Empty after background removal")
 
-    except Exception as e:
-        print(f"Error: {e}")
+    with span("save", path=str(output_path)):
+        save_png(new_img, output_path)
+    print(f"Saved to {output_path}")
 
 if __name__ == "__main__":
-    process_image()
+    process_image(edge_only="--edge-only" in sys.argv)
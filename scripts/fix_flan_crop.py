@@ -1,82 +1,82 @@
-import sys
-from PIL import Image
+from pathlib import Path
 
-def process_image():
-    input_path = 'apps/web/public/assets/flan_bebe_clean.png'
-    output_path = 'apps/web/public/assets/flan_bebe_40px.png' # Overwrite
+from PIL import Image
 
-    try:
-        img = Image.open(input_path).convert("RGBA")
-        width, height = img.size
-        # Assuming 1 row, 4 frames
-        num_frames = 4
-        frame_width = width // num_frames # 160
-        frame_height = height # 160
+from bg_remove import clear, color_key_mask, rgba_array, to_image
+from pipeline_trace import count, span
+from png_optimize import save_png
 
-        target_size = 40
+ROOT = Path(__file__).resolve().parents[1]
+# Alternative cut to fix_final.py (which owns flan_bebe_40px.png); the asset_build node "flan-40px-crop".
+INPUT_PATH = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
+OUTPUT_PATH = ROOT / "apps/web/public/assets/flan_bebe_40px_crop.png"
 
-        new_img = Image.new("RGBA", (target_size * num_frames, target_size), (0,0,0,0))
+def process_image(input_path=INPUT_PATH, output_path=OUTPUT_PATH):
+    with span("load", path=str(input_path)):
+        img = Image.open(input_path).convert("RGBA")
+    width, height = img.size
+    count("pixels", width * height)
+    # Assuming 1 row, 4 frames
+    num_frames = 4
+    frame_width = width // num_frames # 160
+    frame_height = height # 160
 
-        print(f"Processing {num_frames} frames from {width}x{height} image...")
+    target_size = 40
 
-        for i in range(num_frames):
-            # Extract FULL frame (160x160)
-            box = (i * frame_width, 0, (i + 1) * frame_width, frame_height)
-            frame = img.crop(box)
+    new_img = Image.new("RGBA", (target_size * num_frames, target_size), (0,0,0,0))
 
-            # CROP bottom-left quadrant (x:0, y:80 to x:80, y:160)
-            content_box = (0, 80, 80, 160)
-            quadrant = frame.crop(content_box)
+    print(f"Processing {num_frames} frames from {width}x{height} image...")
 
-            # Sample background color from top-left of quadrant
-            bg_r, bg_g, bg_b, bg_a = quadrant.getpixel((0,0))
-            print(f"Frame {i}: bg_color at (0,0) is ({bg_r},{bg_g},{bg_b},{bg_a})")
+    for i in range(num_frames):
+        # Extract FULL frame (160x160)
+        box = (i * frame_width, 0, (i + 1) * frame_width, frame_height)
+        frame = img.crop(box)
 
-            # Brute force removal with tolerance
-            tolerance = 30
-            data = quadrant.getdata()
-            new_data = []
+        # CROP bottom-left quadrant (x:0, y:80 to x:80, y:160)
+        content_box = (0, 80, 80, 160)
+        quadrant = frame.crop(content_box)
 
-            for item in data:
-                r, g, b, a = item
-                if abs(r - bg_r) < tolerance and abs(g - bg_g) < tolerance and abs(b - bg_b) < tolerance:
-                    new_data.append((0,0,0,0))
-                else:
-                    new_data.append(item)
+        # Sample background color from top-left of quadrant
+        bg_r, bg_g, bg_b, bg_a = quadrant.getpixel((0,0))
+        print(f"Frame {i}: bg_color at (0,0) is ({bg_r},{bg_g},{bg_b},{bg_a})")
 
-            quadrant.putdata(new_data)
+        # Brute force removal with tolerance
+        tolerance = 30
+        with span("mask", frame=i):
+            pixels = rgba_array(quadrant)
+            removed = clear(pixels, color_key_mask(pixels, (bg_r, bg_g, bg_b), tolerance, inclusive=False))
+        count("pixels_cleared", removed)
+        quadrant = to_image(pixels)
 
-            # Find actual content bbox
-            bbox = quadrant.getbbox()
+        # Find actual content bbox
+        bbox = quadrant.getbbox()
 
-            if bbox:
-                content = quadrant.crop(bbox)
-                content_w, content_h = content.size
+        if bbox:
+            content = quadrant.crop(bbox)
+            content_w, content_h = content.size
 
-                # Resize to fit 40x40 using NEAREST for retro look
-                scale = min(target_size / content_w, target_size / content_h)
-                new_w = int(content_w * scale)
-                new_h = int(content_h * scale)
+            # Resize to fit 40x40 using NEAREST for retro look
+            scale = min(target_size / content_w, target_size / content_h)
+            new_w = int(content_w * scale)
+            new_h = int(content_h * scale)
 
-                if new_w > 0 and new_h > 0:
-                    content_resized = content.resize((new_w, new_h), Image.Resampling.NEAREST)
+            if new_w > 0 and new_h > 0:
+                content_resized = content.resize((new_w, new_h), Image.Resampling.NEAREST)
 
-                    # Center
-                    paste_x = (target_size - new_w) // 2
-                    paste_y = (target_size - new_h) // 2
+                # Center
+                paste_x = (target_size - new_w) // 2
+                paste_y = (target_size - new_h) // 2
 
-                    new_img.paste(content_resized, (i * target_size + paste_x, paste_y))
-                    print(f"Frame {i}: Content {content_w}x{content_h} -> {new_w}x{new_h}, pasted at {paste_x},{paste_y}")
-                else:
-                    print(f"Frame {i}: Resized to 0")
+                new_img.paste(content_resized, (i * target_size + paste_x, paste_y))
+                print(f"Frame {i}: Content {content_w}x{content_h} -> {new_w}x{new_h}, pasted at {paste_x},{paste_y}")
             else:
-                print(f"Frame {i}: Empty after background removal in quadrant")
-
-        new_img.save(output_path)
-        print(f"Saved to {output_path}")
+                print(f"Frame {i}: Resized to 0")
+        else:
+            print(f"Frame {i}: Empty after background removal in quadrant")
 
-    except Exception as e:
-        print(f"Error: {e}")
+    with span("save", path=str(output_path)):
+        save_png(new_img, output_path)
+    print(f"Saved to {output_path}")
 
 if __name__ == "__main__":
     process_image()
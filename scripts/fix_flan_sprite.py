@@ -1,38 +1,42 @@
+from pathlib import Path
+
 from PIL import Image
-import os
 
-def fix_flan_sprite():
-    src_path = 'apps/web/public/assets/flan_bebe_v2.png'
-    dst_path = 'apps/web/public/assets/flan_bebe_v3.png'
+from grid_detect import detect_grid, uniform_grid
+from pipeline_trace import count, span
+from png_optimize import save_png
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_PATH = ROOT / "apps/web/public/assets/flan_bebe_v2.png"
+DST_PATH = ROOT / "apps/web/public/assets/flan_bebe_v3.png"
 
-    if not os.path.exists(src_path):
-        print(f"Error: {src_path} not found.")
-        return
+def fix_flan_sprite(src_path=SRC_PATH, dst_path=DST_PATH):
 
-    img = Image.open(src_path)
+    with span("load", path=str(src_path)):
+        img = Image.open(src_path)
+        img.load()
+    count("pixels", img.width * img.height)
     print(f"Original size: {img.size}")
 
-    # Assumption: The image is 640x640 and contains 4 frames in a 2x2 grid.
+    # The sheet holds 4 frames in a 2x2 grid (640x640, 320px quadrants).
     # We want to convert this to a 4x1 strip.
-    # Each quadrant is 320x320.
     # Target grid size is 160x160 (as per config).
-
-    # Quadrant coordinates
-    quadrants = [
-        (0, 0, 320, 320),     # Top-left
-        (320, 0, 640, 320),   # Top-right
-        (0, 320, 320, 640),   # Bottom-left
-        (320, 320, 640, 640)  # Bottom-right
-    ]
+    # Detected edges absorb quadrants that are off by a few pixels; anything
+    # other than 2x2 means the detector saw something else, so cut evenly.
+    with span("grid"):
+        grid = detect_grid(img)
+        if (grid.method, grid.cols, grid.rows) != ("grid", 2, 2):
+            grid = uniform_grid(img.width, img.height, 2, 2)
 
     frames = []
-    for box in quadrants:
-        crop = img.crop(box)
-        # Resize to 160x160 to match standard grid density or keep at 320?
-        # Config says gridSize: 160. So let's resize to 160x160.
-        # Use NEAREST to keep pixel art crisp if scaling down integer amount
-        crop = crop.resize((160, 160), Image.NEAREST)
-        frames.append(crop)
+    with span("crop", frames=len(grid.frames)):
+        for frame in grid.frames:
+            crop = img.crop(frame.box)
+            # Resize to 160x160 to match standard grid density or keep at 320?
+            # Config says gridSize: 160. So let's resize to 160x160.
+            # Use NEAREST to keep pixel art crisp if scaling down integer amount
+            crop = crop.resize((160, 160), Image.NEAREST)
+            frames.append(crop)
 
     # Create new strip 640x160 (4 frames * 160 width)
     new_img = Image.new('RGBA', (160 * 4, 160))
@@ -40,7 +44,8 @@ def fix_flan_sprite():
     for i, frame in enumerate(frames):
         new_img.paste(frame, (i * 160, 0))
 
-    new_img.save(dst_path)
+    with span("save", path=str(dst_path)):
+        save_png(new_img, dst_path)
     print(f"Saved fixed sprite to {dst_path} (Size: {new_img.size})")
 
 if __name__ == "__main__":
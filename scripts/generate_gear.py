@@ -1,5 +1,7 @@
 from PIL import Image, ImageDraw
 
+from png_optimize import save_png
+
 def create_gear_icon(size=64, filename="menu_settings.png"):
     # Create a new image with alpha channel
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -58,7 +60,7 @@ def create_gear_icon(size=64, filename="menu_settings.png"):
                 elif x > center and y > center:
                     img.putpixel((x, y), (max(0, r-20), max(0, g-20), max(0, b-20), a))
 
-    img.save(filename)
+    save_png(img, filename)
     print(f"Saved {filename}")
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 
+from png_optimize import save_optimized
+
 def create_pixel_label(text, filename, color=(58, 47, 31)):
     # Create a small image
     # Estimate size: 3px per char width + 1px spacing roughly, height 6px
@@ -46,8 +48,8 @@ def create_pixel_label(text, filename, color=(58, 47, 31)):
     # Save
     path = os.path.join('apps/web/public/assets/ui', filename)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    img.save(path)
-    print(f"Generated {path}")
+    best = save_optimized(img, path)
+    print(f"Generated {path} ({len(best.data)} bytes)")
 
 create_pixel_label('HUN', 'label_hunger.png')
 create_pixel_label('HAP', 'label_happy.png')
@@ -6,6 +6,8 @@ Produce 4 archivos: icon-192, icon-512, icon-maskable-192, icon-maskable-512.
 from PIL import Image, ImageDraw
 import os
 
+from png_optimize import save_optimized
+
 # Paleta del juego
 BG_COLOR      = (42, 31, 20, 255)   # #2a1f14 — carcasa del dispositivo
 BG_DARK       = (15, 13,  8, 255)   # #0f0d08 — fondo más oscuro (borde)
@@ -63,8 +65,8 @@ def main():
         final = Image.new('RGB', (size, size), (15, 13, 8))
         final.paste(img, (0, 0), img)
         out_path = os.path.join(OUTPUT_DIR, filename)
-        final.save(out_path, 'PNG', optimize=True)
-        print(f'  ✓ {out_path} ({size}x{size}, maskable={maskable})')
+        best = save_optimized(final, out_path)
+        print(f'  ✓ {out_path} ({size}x{size}, maskable={maskable}, {len(best.data)} bytes)')
 
     print('\nÍconos generados correctamente.')
 
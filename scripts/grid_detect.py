@@ -0,0 +1,206 @@
+"""Find the frame grid of a sprite sheet from its row/column projections.
+
+The sheet is reduced to a foreground mask (alpha, the corner background
+colour, or the master sheet's checkerboard), and the mask to two 1-D
+projections: how many foreground pixels each column and each row holds. A
+grid with n cells along an axis fits when every internal cell boundary
+falls on an empty projection line and every slab of cells has content; the
+largest such n wins on each axis. Sheets that are not on a grid fall back to
+the runs of occupied columns/rows (the projection segments analyze_content.py
+prints).
+
+Everything is NumPy reductions over the mask; a 4096x4096 sheet takes about
+0.2 s, most of it building the mask.
+
+    python scripts/grid_detect.py sheet.png [--background checker] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bg_remove import checker_mask, color_key_mask
+
+
+BACKGROUNDS = ("auto", "alpha", "corner", "checker")
+
+
+@dataclass(frozen=True)
+class Frame:
+    index: int
+    row: int
+    col: int
+    box: tuple[int, int, int, int]  # cell in sheet coordinates, (x1, y1, x2, y2) exclusive
+    bbox: tuple[int, int, int, int] | None  # content inside the cell, sheet coordinates
+
+
+@dataclass(frozen=True)
+class Grid:
+    method: str  # "grid", "segments" or "fixed" (see uniform_grid)
+    xs: tuple[int, ...]  # column edges, len = cols + 1 (segments: start/end pairs flattened)
+    ys: tuple[int, ...]
+    frames: tuple[Frame, ...]
+
+    @property
+    def cols(self) -> int:
+        return len(self.xs) - 1 if self.method != "segments" else len(self.xs) // 2
+
+    @property
+    def rows(self) -> int:
+        return len(self.ys) - 1 if self.method != "segments" else len(self.ys) // 2
+
+    @property
+    def cell_size(self) -> tuple[int, int] | None:
+        """(width, height) when the grid is uniform to the pixel, else None."""
+        if self.method == "segments":
+            return None
+        widths = set(np.diff(self.xs).tolist())
+        heights = set(np.diff(self.ys).tolist())
+        return (widths.pop(), heights.pop()) if len(widths) == len(heights) == 1 else None
+
+
+def foreground_mask(arr: np.ndarray, background: str = "auto", tolerance: int = 16) -> np.ndarray:
+    """True where a pixel belongs to a sprite."""
+    if background == "auto":
+        background = "alpha" if (arr[..., 3] < 255).any() else "corner"
+    if background == "alpha":
+        return arr[..., 3] > 0
+    if background == "checker":
+        return ~checker_mask(arr)
+    h, w = arr.shape[:2]
+    corners = [tuple(arr[y, x, :3]) for y in (0, h - 1) for x in (0, w - 1)]
+    key = max(set(corners), key=corners.count)
+    return ~color_key_mask(arr, key, tolerance)
+
+
+def _segments(occupied: np.ndarray) -> list[tuple[int, int]]:
+    edges = np.diff(np.concatenate(([0], occupied.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+
+def fit_axis(profile: np.ndarray, min_cell: int = 8, slack: int = 1) -> list[int] | None:
+    """Cell edges along one axis for the largest clean grid, or None.
+
+    `profile` is the foreground count per line. Boundaries sit at
+    round(k * length / n) so sheets like 1024px / 3 still fit.
+    """
+    length = profile.size
+    occupied = profile > 0
+    if not occupied.any():
+        return None
+    # Prefix sums make "is [b - slack, b + slack] empty" O(1) per boundary.
+    prefix = np.concatenate(([0], np.cumsum(occupied)))
+    for n in range(length // min_cell, 1, -1):
+        edges = np.round(np.arange(n + 1) * (length / n)).astype(np.int64)
+        inner = edges[1:-1]
+        lo = np.clip(inner - slack, 0, length)
+        hi = np.clip(inner + slack + 1, 0, length)
+        if (prefix[hi] - prefix[lo]).any():
+            continue
+        if ((prefix[edges[1:]] - prefix[edges[:-1]]) == 0).any():
+            continue  # an empty slab means the pitch is a fraction of the real one
+        return edges.tolist()
+    return [0, length]
+
+
+def detect_grid(
+    img: Image.Image | np.ndarray,
+    background: str = "auto",
+    min_cell: int = 8,
+    tolerance: int = 16,
+) -> Grid:
+    if isinstance(img, np.ndarray):
+        arr = img
+    else:
+        # Read-only is fine here; skip rgba_array's writable copy.
+        arr = np.asarray(img if img.mode == "RGBA" else img.convert("RGBA"))
+    mask = foreground_mask(arr, background, tolerance)
+    cols_profile = mask.sum(axis=0)
+    rows_profile = mask.sum(axis=1)
+    xs = fit_axis(cols_profile, min_cell)
+    ys = fit_axis(rows_profile, min_cell)
+
+    if xs is None or ys is None:
+        return Grid("grid", (0, arr.shape[1]), (0, arr.shape[0]), ())
+    if len(xs) > 2 or len(ys) > 2:
+        cells = [(c, r, (xs[c], ys[r], xs[c + 1], ys[r + 1])) for r in range(len(ys) - 1) for c in range(len(xs) - 1)]
+        method, gx, gy = "grid", xs, ys
+    else:
+        # No clean pitch on either axis: use the projection runs as frames.
+        xseg = _segments(cols_profile > 0)
+        yseg = _segments(rows_profile > 0)
+        cells = [(c, r, (x1, y1, x2, y2)) for r, (y1, y2) in enumerate(yseg) for c, (x1, x2) in enumerate(xseg)]
+        method, gx, gy = "segments", [v for s in xseg for v in s], [v for s in yseg for v in s]
+
+    frames = []
+    for col, row, (x1, y1, x2, y2) in cells:
+        cell = mask[y1:y2, x1:x2]
+        cx = np.flatnonzero(cell.any(axis=0))
+        cy = np.flatnonzero(cell.any(axis=1))
+        bbox = None
+        if cx.size:
+            bbox = (x1 + int(cx[0]), y1 + int(cy[0]), x1 + int(cx[-1]) + 1, y1 + int(cy[-1]) + 1)
+        frames.append(Frame(len(frames), row, col, (x1, y1, x2, y2), bbox))
+    return Grid(method, tuple(gx), tuple(gy), tuple(frames))
+
+
+def uniform_grid(width: int, height: int, cols: int, rows: int) -> Grid:
+    """A fixed cols x rows grid (the old hardcoded layouts), with no content info.
+
+    Cells are width // cols by height // rows, as the scripts always cut them;
+    any remainder on the right/bottom edge is left out.
+    """
+    xs = tuple(c * (width // cols) for c in range(cols + 1))
+    ys = tuple(r * (height // rows) for r in range(rows + 1))
+    frames = tuple(
+        Frame(r * cols + c, r, c, (xs[c], ys[r], xs[c + 1], ys[r + 1]), None) for r in range(rows) for c in range(cols)
+    )
+    return Grid("fixed", xs, ys, frames)
+
+
+def detect_or_uniform(img: Image.Image, cols: int, rows: int, **kwargs) -> Grid:
+    """detect_grid, falling back to a uniform cols x rows grid when no clean grid shows up."""
+    grid = detect_grid(img, **kwargs)
+    if grid.method == "grid" and (grid.cols > 1 or grid.rows > 1):
+        return grid
+    print(f"grid_detect: no clean grid found, assuming {cols}x{rows}")
+    return uniform_grid(img.width, img.height, cols, rows)
+
+
+def crop_frames(img: Image.Image, grid: Grid, skip_empty: bool = True) -> list[Image.Image]:
+    """Frame images in reading order, ready for pack_strip / pack_strip_trimmed.
+
+    Frames of a "fixed" grid carry no content info and are always kept.
+    """
+    return [img.crop(f.box) for f in grid.frames if f.bbox is not None or grid.method == "fixed" or not skip_empty]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Detect the frame grid of a sprite sheet.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--background", choices=BACKGROUNDS, default="auto")
+    parser.add_argument("--min-cell", type=int, default=8, help="smallest cell size considered, in pixels")
+    parser.add_argument("--json", action="store_true", help="print the frame list as JSON")
+    args = parser.parse_args(argv)
+
+    with Image.open(args.path) as img:
+        grid = detect_grid(img, args.background, args.min_cell)
+    if args.json:
+        print(json.dumps({"method": grid.method, "xs": grid.xs, "ys": grid.ys, "frames": [asdict(f) for f in grid.frames]}, indent=2))
+        return 0
+    size = grid.cell_size
+    pitch = f", cell {size[0]}x{size[1]}" if size else ""
+    print(f"{args.path}: {grid.method} {grid.cols}x{grid.rows}{pitch}")
+    for f in grid.frames:
+        print(f"  frame {f.index} r{f.row} c{f.col} box={f.box} content={f.bbox}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Content-hashed copies of the canon strips, plus the key -> path map the app imports.
+
+    python scripts/hash_assets.py            # write egg.<hash>.png copies and the map
+    python scripts/hash_assets.py --clean    # back to the stable names
+
+Each strip from canon_extract_manifest.json (or SPECS) gets a sibling
+copy named <stem>.<first 10 hex of its SHA-256><suffix>, and
+apps/web/src/game/renderer/hashedAssets.json maps its key (FIU_EGG, ...) to
+that copy's public path. SpriteConfigs.ts prefers the mapped path, so a
+changed strip gets a new URL and every URL can be served with
+Cache-Control: immutable. Older hashed copies of the same strip are
+removed. With an empty map the app keeps loading the stable names.
+
+The stable-name strips stay in public/ (the other scripts read them), but
+the app never requests a mapped one, so apps/web/vite.config.ts drops them
+from dist/ and a deploy ships each strip once. asset_build.py runs this as
+the hashed-assets node, so the map follows every strip change.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+
+from build_atlas import PUBLIC
+from extract_canon_sprites import MANIFEST, OUT_ROOT, ROOT, SPECS, file_digest, load_json, write_if_changed
+
+
+MAP_PATH = ROOT / "apps/web/src/game/renderer/hashedAssets.json"
+HASH_LEN = 10
+
+
+def strips(manifest_path: Path = MANIFEST) -> dict[str, Path]:
+    manifest = load_json(manifest_path)
+    if manifest:
+        return {key: ROOT / entry["output"] for key, entry in manifest.items()}
+    return {spec.key: OUT_ROOT / spec.folder / spec.filename for spec in SPECS}
+
+
+def hashed_copies(path: Path) -> list[Path]:
+    pattern = re.compile(rf"{re.escape(path.stem)}\.[0-9a-f]{{{HASH_LEN}}}{re.escape(path.suffix)}")
+    return sorted(p for p in path.parent.glob(f"{path.stem}.*{path.suffix}") if pattern.fullmatch(p.name))
+
+
+def hash_strip(path: Path) -> Path:
+    """Copy `path` to its hashed name (if not there yet) and drop older hashed copies."""
+    target = path.with_name(f"{path.stem}.{file_digest(path)[:HASH_LEN]}{path.suffix}")
+    if not target.exists():
+        shutil.copyfile(path, target)
+    for old in hashed_copies(path):
+        if old != target:
+            old.unlink()
+    return target
+
+
+def load_map(path: Path = MAP_PATH) -> dict[str, str]:
+    return load_json(path)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write content-hashed strip copies and the key -> path map.")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="canon_extract_manifest.json")
+    parser.add_argument("--clean", action="store_true", help="remove hashed copies and empty the map")
+    args = parser.parse_args(argv)
+
+    mapping: dict[str, str] = {}
+    for key, path in strips(args.manifest).items():
+        if not path.exists():
+            print(f"{key}: missing {path}")
+            continue
+        if args.clean:
+            for old in hashed_copies(path):
+                old.unlink()
+            continue
+        mapping[key] = hash_strip(path).relative_to(PUBLIC).as_posix()
+
+    if write_if_changed(MAP_PATH, json.dumps(mapping, indent=2, sort_keys=True) + "\n"):
+        print(f"asset map: {MAP_PATH}")
+    print(f"{len(mapping)} hashed strip(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
-from PIL import Image
 import os
+from pathlib import Path
 
-assets_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets"
+from decode_cache import open_cached
+
+assets_dir = Path(__file__).resolve().parents[1] / "apps/web/public/assets"
 files = [
     "tamagotchi_spritesheet_1768544718465.png",
     "bagel_spritesheet_1768545538660.png"
@@ -14,7 +16,7 @@ for f in files:
         continue
 
     try:
-        img = Image.open(path)
+        img = open_cached(path)
         print(f"--- {f} ---")
         print(f"Size: {img.size}")
         print(f"Mode: {img.mode}")
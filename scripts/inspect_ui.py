@@ -1,6 +1,8 @@
 from PIL import Image
 import os
 
+from png_optimize import save_png
+
 path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\retro_ui_icons_1768544742647.png"
 debug_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\scripts\debug_output"
 
@@ -12,7 +14,7 @@ if os.path.exists(path):
     print(f"UI Sheet: {img.size} Mode={img.mode}")
 
     # Save a crop of the top area to see if icons are there
-    img.crop((0, 0, 500, 100)).save(os.path.join(debug_dir, "ui_top_crop.png"))
+    save_png(img.crop((0, 0, 500, 100)), os.path.join(debug_dir, "ui_top_crop.png"))
 
     # Check if it has uniform background
     bg = img.getpixel((0,0))
@@ -0,0 +1,200 @@
+"""Structured timing, counters and optional profiling for the asset scripts.
+
+Nothing is recorded unless one of these is set:
+
+    ASSET_TRACE=-                 JSON Lines to stderr
+    ASSET_TRACE=trace.jsonl       JSON Lines appended to a file (safe across worker processes)
+    ASSET_PROFILE=cprofile        dump a .prof per run and log the top functions
+    ASSET_PROFILE=tracemalloc     per-span peak allocation plus the top allocation sites
+    ASSET_PROFILE=cprofile,tracemalloc
+
+Every record carries the script name and pid. Spans are written when they
+close, with their duration, nesting and any counters bumped while they were
+open; process-wide counter totals are written at exit.
+
+Every transform behind asset_build, and analyze_assets, records its own
+load/crop/mask/save spans. The one-off inspection and generator scripts
+(inspect_*, debug_density, generate_*, ...) are timed and profiled as a whole:
+
+    ASSET_TRACE=- ASSET_PROFILE=cprofile python scripts/pipeline_trace.py scripts/inspect_sheet.py
+"""
+from __future__ import annotations
+
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import runpy
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+PROFILE_DIR = Path(__file__).resolve().parent / ".cache/profiles"
+TOP_N = 15
+
+_sink = os.environ.get("ASSET_TRACE", "").strip()
+_profile = {kind.strip().lower() for kind in os.environ.get("ASSET_PROFILE", "").split(",") if kind.strip()}
+_stack: list[dict] = []
+_totals: Counter = Counter()
+_profiler: cProfile.Profile | None = None
+_owner_pid = os.getpid()
+
+
+def enabled() -> bool:
+    return bool(_sink or _profile)
+
+
+def script_name() -> str:
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+
+def emit(event: str, **fields) -> None:
+    """Write one JSON Lines record to the ASSET_TRACE sink (no-op when unset)."""
+    if not _sink:
+        return
+    record = {"event": event, "script": script_name(), "pid": os.getpid(), "time": round(time.time(), 6), **fields}
+    line = json.dumps(record, default=str) + "\n"
+    if _sink == "-":
+        sys.stderr.write(line)
+        return
+    # One O_APPEND write per record keeps lines whole when pool workers share the file.
+    fd = os.open(_sink, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Bump a counter on the innermost open span and on the process totals."""
+    if not enabled():
+        return
+    _totals[name] += value
+    if _stack:
+        counters = _stack[-1]["counters"]
+        counters[name] = counters.get(name, 0) + value
+
+
+@contextmanager
+def span(name: str, **fields) -> Iterator[None]:
+    """Time a block; nested spans record their parent and depth."""
+    if not enabled():
+        yield
+        return
+    frame = {"name": name, "counters": {}, "peak": 0}
+    parent = _stack[-1]["name"] if _stack else None
+    _stack.append(frame)
+    tracing_memory = tracemalloc.is_tracing()
+    if tracing_memory:
+        start_mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        if not (isinstance(exc, SystemExit) and not exc.code):
+            error = type(exc).__name__
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _stack.pop()
+        record = {"name": name, "parent": parent, "depth": len(_stack), "seconds": round(seconds, 6), **fields}
+        if frame["counters"]:
+            record["counters"] = frame["counters"]
+            for key, value in frame["counters"].items():
+                # Roll counts up so a parent span also sees what its children counted.
+                if _stack:
+                    _stack[-1]["counters"][key] = _stack[-1]["counters"].get(key, 0) + value
+        if tracing_memory:
+            # Child spans reset the tracemalloc peak, so they hand theirs up explicitly.
+            peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+            record["alloc_peak_kb"] = max(0, peak - start_mem) // 1024
+            if _stack:
+                _stack[-1]["peak"] = max(_stack[-1]["peak"], peak)
+        if error:
+            record["error"] = error
+        emit("span", **record)
+
+
+def _top_functions(profiler: cProfile.Profile) -> list[dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, func), (_, calls, own, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+        rows.append(
+            {
+                "function": f"{Path(filename).name}:{line}({func})",
+                "calls": calls,
+                "own_seconds": round(own, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+        )
+    rows.sort(key=lambda r: r["cumulative_seconds"], reverse=True)
+    return rows[:TOP_N]
+
+
+def _finish() -> None:
+    # Forked workers inherit this hook; only the process that started tracing reports.
+    if os.getpid() != _owner_pid:
+        return
+    if _totals:
+        emit("counters", counters=dict(_totals))
+    if _profiler is not None:
+        _profiler.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{script_name()}-{os.getpid()}.prof"
+        _profiler.dump_stats(path)
+        emit("profile", kind="cprofile", path=str(path), top=_top_functions(_profiler))
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        sites = tracemalloc.take_snapshot().statistics("lineno")[:TOP_N]
+        emit(
+            "profile",
+            kind="tracemalloc",
+            current_kb=current // 1024,
+            peak_kb=peak // 1024,
+            top=[{"site": str(stat.traceback[0]), "size_kb": stat.size // 1024, "count": stat.count} for stat in sites],
+        )
+        tracemalloc.stop()
+
+
+def _start() -> None:
+    global _profiler
+    unknown = _profile - {"cprofile", "tracemalloc"}
+    if unknown:
+        print(f"pipeline_trace: ignoring unknown ASSET_PROFILE value(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+    if "tracemalloc" in _profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if "cprofile" in _profile:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    atexit.register(_finish)
+
+
+if enabled():
+    _start()
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(__doc__)
+        return
+    script = Path(argv[0]).resolve()
+    sys.argv = [str(script), *argv[1:]]
+    sys.path.insert(0, str(script.parent))
+    # The target's own `import pipeline_trace` must get this module, not a second copy.
+    sys.modules.setdefault("pipeline_trace", sys.modules[__name__])
+    with span("script", path=str(script), args=argv[1:]):
+        runpy.run_path(str(script), run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Lossless PNG shrinking for the pixel-art assets.
+
+Images that fit in 256 colours are written as palette (P) PNGs with a tRNS
+alpha chunk, at 1/2/4 bits per pixel when the palette is small enough. Every
+image is then encoded with each PNG row filter and several zlib strategies and
+the smallest result wins. Pixels are never altered.
+
+    python scripts/png_optimize.py                      # every PNG under apps/web/public
+    python scripts/png_optimize.py path/a.png path/b.png
+
+The same encoder is the scripts' canonical PNG writer: save_png(img, path)
+writes IHDR, PLTE/tRNS, one IDAT and IEND only (no timestamps, gamma, text
+or other ancillary chunks) with a fixed filter and zlib setup, so the bytes
+depend on the pixels alone, not on the machine or Pillow version. A file
+that already holds the same pixels is left untouched, which keeps content
+hashes (extract cache, hash_assets, the precache manifest) stable across
+re-runs.
+
+    save_png(strip, out_path)   # True when the file was (re)written
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import struct
+import sys
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from pipeline_trace import count, span
+
+
+ROOT = Path(__file__).resolve().parents[1]
+PUBLIC = ROOT / "apps/web/public"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {"L": 0, "RGB": 2, "P": 3, "LA": 4, "RGBA": 6}
+FILTERS = (0, 1, 2, 3, 4, "adaptive")
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+# Fixed settings for canonical_png.
+CANONICAL_FILTER = "adaptive"
+CANONICAL_STRATEGY = zlib.Z_DEFAULT_STRATEGY
+
+
+@dataclass(frozen=True)
+class Encoded:
+    data: bytes
+    mode: str
+    bit_depth: int
+    filter: int | str
+    strategy: int
+
+
+def _chunk(tag: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", zlib.crc32(tag + payload))
+
+
+def reduce_image(img: Image.Image) -> tuple[np.ndarray, str, np.ndarray | None]:
+    """Smallest lossless representation: (pixel rows, mode, RGBA palette or None)."""
+    rgba = np.asarray(img.convert("RGBA"))
+    h, w = rgba.shape[:2]
+    packed = rgba.reshape(-1, 4).copy().view(np.uint32).ravel()
+    colors, index = np.unique(packed, return_inverse=True)
+    if colors.size <= 256:
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        # Translucent entries first keeps the tRNS chunk as short as possible.
+        order = np.argsort(palette[:, 3] == 255, kind="stable")
+        remap = np.empty_like(order)
+        remap[order] = np.arange(order.size)
+        return remap[index].reshape(h, w).astype(np.uint8), "P", palette[order]
+
+    opaque = bool((rgba[..., 3] == 255).all())
+    gray = bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+    if gray:
+        return (rgba[..., 0] if opaque else rgba[..., [0, 3]]), ("L" if opaque else "LA"), None
+    return (rgba[..., :3] if opaque else rgba), ("RGB" if opaque else "RGBA"), None
+
+
+def palette_bit_depth(count: int) -> int:
+    for depth in (1, 2, 4):
+        if count <= 1 << depth:
+            return depth
+    return 8
+
+
+def raw_rows(pixels: np.ndarray, bit_depth: int) -> np.ndarray:
+    """Pixels as unfiltered PNG scanline bytes, shape (height, row_bytes)."""
+    h = pixels.shape[0]
+    if bit_depth == 8:
+        return np.ascontiguousarray(pixels.reshape(h, -1), dtype=np.uint8)
+    per_byte = 8 // bit_depth
+    w = pixels.shape[1]
+    padded = np.zeros((h, -(-w // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :w] = pixels
+    groups = padded.reshape(h, -1, per_byte)
+    shifts = (8 - bit_depth * (np.arange(per_byte) + 1)).astype(np.uint8)
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def filter_rows(rows: np.ndarray, bpp: int, kind: int | str) -> np.ndarray:
+    """Apply one PNG filter type (or per-row adaptive choice); returns rows with the filter byte."""
+    x = rows.astype(np.int16)
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    upleft = np.zeros_like(x)
+    upleft[:, bpp:] = up[:, :-bpp]
+
+    p = left + up - upleft
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - upleft)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+    candidates = np.stack(
+        [x, x - left, x - up, x - (left + up) // 2, x - paeth]
+    ).astype(np.uint8)  # wraps modulo 256
+
+    if kind == "adaptive":
+        # Standard minimum-sum-of-absolute-differences heuristic, per row.
+        cost = np.abs(candidates.astype(np.int8).astype(np.int32)).sum(axis=2)
+        choice = cost.argmin(axis=0)
+    else:
+        choice = np.full(rows.shape[0], kind)
+    picked = candidates[choice, np.arange(rows.shape[0])]
+    return np.concatenate([choice.astype(np.uint8)[:, None], picked], axis=1)
+
+
+def encode(
+    pixels: np.ndarray,
+    mode: str,
+    palette: np.ndarray | None,
+    kind: int | str,
+    strategy: int,
+    level: int = 9,
+) -> Encoded:
+    h, w = pixels.shape[:2]
+    bit_depth = palette_bit_depth(len(palette)) if palette is not None else 8
+    channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+    bpp = max(1, channels * bit_depth // 8)
+    filtered = filter_rows(raw_rows(pixels, bit_depth), bpp, kind)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, strategy)
+    idat = compressor.compress(filtered.tobytes()) + compressor.flush()
+
+    out = [PNG_SIGNATURE, _chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, bit_depth, COLOR_TYPES[mode], 0, 0, 0))]
+    if palette is not None:
+        out.append(_chunk(b"PLTE", palette[:, :3].tobytes()))
+        translucent = int((palette[:, 3] < 255).sum())
+        if translucent:
+            out.append(_chunk(b"tRNS", palette[:translucent, 3].tobytes()))
+    out.append(_chunk(b"IDAT", idat))
+    out.append(_chunk(b"IEND", b""))
+    return Encoded(b"".join(out), mode, bit_depth, kind, strategy)
+
+
+def optimize(img: Image.Image, filters=FILTERS, strategies=STRATEGIES, finalists: int = 3) -> Encoded:
+    """Smallest encoding over filters x strategies.
+
+    Candidates are ranked with a fast zlib level first; only the best few are
+    recompressed at level 9, which keeps 1024px sheets to about a second.
+    """
+    with span("reduce"):
+        pixels, mode, palette = reduce_image(img)
+    count("pixels", img.width * img.height)
+    with span("rank", candidates=len(filters) * len(strategies)):
+        trials = sorted(
+            ((len(encode(pixels, mode, palette, kind, strategy, level=1).data), i, kind, strategy)
+             for i, (kind, strategy) in enumerate((k, s) for k in filters for s in strategies)),
+        )
+    with span("encode", finalists=finalists):
+        # Only our own encodings compete, so the result depends on the pixels
+        # and zlib alone, never on the Pillow version.
+        best = None
+        for _, _, kind, strategy in trials[:finalists]:
+            candidate = encode(pixels, mode, palette, kind, strategy)
+            if best is None or len(candidate.data) < len(best.data):
+                best = candidate
+    return best
+
+
+def canonical_png(img: Image.Image) -> bytes:
+    """The one PNG encoding of `img`'s pixels: reduced mode, fixed filter and zlib settings, no metadata."""
+    pixels, mode, palette = reduce_image(img)
+    return encode(pixels, mode, palette, CANONICAL_FILTER, CANONICAL_STRATEGY).data
+
+
+def pixel_digest(img: Image.Image) -> str:
+    """SHA-256 of the size and RGBA pixels; equal for files that decode to the same image."""
+    rgba = img.convert("RGBA")
+    return hashlib.sha256(f"{rgba.width}x{rgba.height}".encode() + rgba.tobytes()).hexdigest()
+
+
+def same_pixels(path: Path, img: Image.Image) -> bool:
+    try:
+        with Image.open(path) as existing:
+            existing.load()
+            return pixel_digest(existing) == pixel_digest(img)
+    except (FileNotFoundError, OSError, SyntaxError, ValueError):
+        return False
+
+
+def save_png(img: Image.Image, path: Path, data: bytes | None = None) -> bool:
+    """Write `img` to `path` (as `data`, else canonical_png) unless the file already has these pixels."""
+    path = Path(path)
+    if data is None:
+        data = canonical_png(img)
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    else:
+        if same_pixels(path, img):
+            count("png_rewrites_skipped")
+            return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def save_optimized(img: Image.Image, path: Path) -> Encoded:
+    """Write `img` to `path` as the smallest lossless PNG we can produce (unless it already holds these pixels)."""
+    best = optimize(img)
+    save_png(img, path, best.data)
+    return best
+
+
+def optimize_file(path: Path, dry_run: bool = False) -> tuple[int, int, Encoded]:
+    """Re-encode an existing PNG in place if that makes it smaller; returns (before, after, best)."""
+    with span("file", path=str(path)):
+        before = path.stat().st_size
+        with span("load"), Image.open(path) as img:
+            img.load()
+        best = optimize(img)
+        after = min(before, len(best.data))
+        if len(best.data) < before and not dry_run:
+            with span("save"):
+                path.write_bytes(best.data)
+        count("bytes_saved", before - after)
+    return before, after, best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Losslessly shrink PNG assets (palette + filter/zlib search).")
+    parser.add_argument("paths", nargs="*", type=Path, help=f"PNG files or folders (default: {PUBLIC})")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without rewriting files")
+    args = parser.parse_args(argv)
+
+    files: list[Path] = []
+    for p in args.paths or [PUBLIC]:
+        files.extend(sorted(p.rglob("*.png")) if p.is_dir() else [p])
+
+    total_before = total_after = 0
+    for path in files:
+        before, after, best = optimize_file(path, args.dry_run)
+        total_before += before
+        total_after += after
+        label = f"{best.mode}{best.bit_depth}" if best.mode == "P" else best.mode
+        print(f"{path}: {before} -> {after} bytes (-{before - after}, {label}, filter={best.filter})")
+
+    saved = total_before - total_after
+    pct = 100 * saved / total_before if total_before else 0.0
+    print(f"total: {total_before} -> {total_after} bytes, saved {saved} ({pct:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
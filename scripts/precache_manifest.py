@@ -0,0 +1,99 @@
+"""Write the service worker's precache manifest: every generated sprite asset with its hash.
+
+    python scripts/precache_manifest.py
+
+apps/web/public/precache-manifest.json lists the canon strips (from
+canon_extract_manifest.json, or SPECS when the extractor has not run; the
+content-hashed copy when hash_assets.py mapped one) and the atlas pages
+plus their frame map, each with a URL relative to the public root, a SHA-256 of the file and its size. Entries matching CRITICAL
+are precached when sw.js installs; the rest are fetched right after it
+activates. On later deploys the worker compares hashes and only downloads
+files whose hash changed.
+
+The manifest version is also stamped into sw.js (ASSET_VERSION): sprites
+are served cache-first and only re-checked when a new worker activates, so
+a deploy that changes nothing but sprites must still change sw.js.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from fnmatch import fnmatch
+from pathlib import Path
+
+from build_atlas import OUT_DIR as ATLAS_DIR
+from build_atlas import PUBLIC
+from extract_canon_sprites import MANIFEST, file_digest, load_json, write_if_changed
+from hash_assets import load_map, strips
+
+
+OUTPUT = PUBLIC / "precache-manifest.json"
+WORKER = PUBLIC / "sw.js"
+VERSION_LINE = re.compile(r"^const ASSET_VERSION = '[0-9a-f]*';$", re.MULTILINE)
+# Needed for the first frame: every line starts as an egg, FLAN_BEBE is the
+# renderer's fallback, and the atlas covers all of them when it is in use.
+CRITICAL = ("assets/sprites/*/egg*.png", "assets/sprites/flan/bebe*.png", "assets/sprites/atlas/*")
+
+
+def asset_paths(manifest_path: Path = MANIFEST, atlas_dir: Path = ATLAS_DIR) -> list[Path]:
+    hashed = load_map()
+    # The app loads the hashed copy whenever the map has one.
+    paths = [PUBLIC / hashed[key] if key in hashed else path for key, path in strips(manifest_path).items()]
+    frame_map = atlas_dir / "atlas.json"
+    if frame_map.exists():
+        paths.append(frame_map)
+        paths.extend(PUBLIC / page["src"] for page in load_json(frame_map).get("atlases", []))
+    # Specs that share an output (none today) would otherwise be listed twice.
+    return [p for p in dict.fromkeys(paths) if p.exists()]
+
+
+def build_manifest(paths: list[Path], critical: tuple[str, ...] = CRITICAL) -> dict:
+    assets = []
+    for path in paths:
+        url = path.relative_to(PUBLIC).as_posix()
+        assets.append(
+            {
+                "url": url,
+                "hash": file_digest(path),
+                "size": path.stat().st_size,
+                "critical": any(fnmatch(url, pattern) for pattern in critical),
+            }
+        )
+    assets.sort(key=lambda a: a["url"])
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode()).hexdigest()[:16]
+    return {"version": version, "assets": assets}
+
+
+def stamp_worker(version: str, worker: Path = WORKER) -> bool:
+    """Write `version` into sw.js's ASSET_VERSION line; True when the file changed."""
+    text = worker.read_text(encoding="utf-8")
+    stamped, n = VERSION_LINE.subn(f"const ASSET_VERSION = '{version}';", text)
+    if n != 1:
+        raise RuntimeError(f"{worker}: expected one ASSET_VERSION line, found {n}")
+    return write_if_changed(worker, stamped)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write the hashed precache manifest read by sw.js.")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="canon_extract_manifest.json")
+    parser.add_argument("--out", type=Path, default=OUTPUT)
+    args = parser.parse_args(argv)
+
+    manifest = build_manifest(asset_paths(args.manifest))
+    critical = [a for a in manifest["assets"] if a["critical"]]
+    if write_if_changed(args.out, json.dumps(manifest, indent=2) + "\n"):
+        print(f"precache manifest: {args.out}")
+    if stamp_worker(manifest["version"]):
+        print(f"service worker: {WORKER} (ASSET_VERSION {manifest['version']})")
+    print(
+        f"{len(manifest['assets'])} assets ({sum(a['size'] for a in manifest['assets'])} bytes), "
+        f"{len(critical)} critical ({sum(a['size'] for a in critical)} bytes), version {manifest['version']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,50 @@
-from PIL import Image
-import os
-
-source_path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_v2.png"
-output_path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\flan_bebe_clean.png"
-
-def process():
-    if not os.path.exists(source_path):
-        print(f"Source not found: {source_path}")
-        return
-
-    try:
-        with Image.open(source_path) as img:
-            print(f"Source size: {img.size}")
-
-            # Helper to crop a grid cell
-            # Rows 0-3, Cols 0-3. Grid size 160x160?
-            grid_size = 160
+from pathlib import Path
 
-            # We want Row 0 (Idle)
-            frames = []
-            row = 0
-            for col in range(4):
-                left = col * grid_size
-                upper = row * grid_size
-                right = left + grid_size
-                lower = upper + grid_size
+from PIL import Image
 
+from grid_detect import detect_grid, uniform_grid
+from pipeline_trace import count, span
+from png_optimize import save_png
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "apps/web/public/assets/flan_bebe_v2.png"
+OUTPUT = ROOT / "apps/web/public/assets/flan_bebe_clean.png"
+
+def process(source_path=SOURCE, output_path=OUTPUT):
+    with Image.open(source_path) as img:
+        with span("load", path=str(source_path)):
+            img.load()
+        count("pixels", img.width * img.height)
+        print(f"Source size: {img.size}")
+
+        # Rows 0-3, Cols 0-3 (160px cells on the 640x640 sheet). Detected
+        # edges absorb cells that are off by a few pixels; a grid without 4
+        # columns is not this layout, so cut evenly.
+        with span("grid"):
+            grid = detect_grid(img)
+            if grid.method != "grid" or grid.cols != 4:
+                grid = uniform_grid(img.width, img.height, 4, 4)
+
+        # We want Row 0 (Idle)
+        frames = []
+        with span("crop"):
+            for frame in grid.frames:
+                if frame.row != 0:
+                    continue
+                left, upper, right, lower = frame.box
                 print(f"Cropping {left},{upper} -> {right},{lower}")
-                crop = img.crop((left, upper, right, lower))
-                frames.append(crop)
-
-            # Create a horizontal strip (640x160)
-            strip = Image.new('RGBA', (640, 160))
-            for i, frame in enumerate(frames):
-                strip.paste(frame, (i * 160, 0))
-
-            strip.save(output_path)
-            print(f"Saved strip to {output_path}")
-
-    except Exception as e:
-        print(f"Error: {e}")
+                frames.append(img.crop(frame.box))
+
+        # Create a horizontal strip, one widest-cell slot per frame (640x160)
+        cell_w = max(frame.width for frame in frames)
+        cell_h = max(frame.height for frame in frames)
+        strip = Image.new('RGBA', (cell_w * len(frames), cell_h))
+        for i, frame in enumerate(frames):
+            strip.paste(frame, (i * cell_w, 0))
+
+        with span("save", path=str(output_path)):
+            save_png(strip, output_path)
+        print(f"Saved strip to {output_path}")
 
 if __name__ == "__main__":
     process()
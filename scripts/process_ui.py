@@ -1,55 +1,42 @@
-import os
+from pathlib import Path
+
 from PIL import Image
 
-def process_ui():
-    INPUT_PATH = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\retro_ui_icons_1768544742647.png"
-    OUTPUT_PATH = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\ui_icons_strip.png"
+from bg_remove import clear, color_key_mask, rgba_array, to_image
+from grid_detect import detect_or_uniform
+from pipeline_trace import count, span
+from png_optimize import save_png
 
-    if not os.path.exists(INPUT_PATH):
-        print("Input not found")
-        return
+ROOT = Path(__file__).resolve().parents[1]
+INPUT_PATH = ROOT / "apps/web/public/assets/retro_ui_icons_1768544742647.png"
+OUTPUT_PATH = ROOT / "apps/web/public/assets/ui_icons_strip.png"
 
-    print(f"Processing {INPUT_PATH}...")
-    img = Image.open(INPUT_PATH).convert("RGBA")
+def process_ui(input_path=INPUT_PATH, output_path=OUTPUT_PATH):
+    print(f"Processing {input_path}...")
+    with span("load", path=str(input_path)):
+        pixels = rgba_array(Image.open(input_path))
+    count("pixels", pixels.shape[0] * pixels.shape[1])
 
     # Background removal
     bg_color = (203, 205, 204)
     threshold = 20
 
-    datas = img.getdata()
-    new_data = []
-    for item in datas:
-        if abs(item[0] - bg_color[0]) < threshold and \
-           abs(item[1] - bg_color[1]) < threshold and \
-           abs(item[2] - bg_color[2]) < threshold:
-            new_data.append((255, 255, 255, 0)) # Transparent
-        else:
-            new_data.append(item)
-    img.putdata(new_data)
-
-    # Grid Logic:
-    # Since blob detection failed, let's assume a 3x3 grid or similar layout if it was generated by AI.
-    # Actually, let's try to detect rows again but with better logging.
-    # Or, crop fixed regions if we can guess.
-
-    # Alternative: Scan again but print what it sees.
-    # The file size is 1024x1024. If it has 9 icons, they might be arranged in a 3x3 grid,
-    # effectively filling the space or centered in cells.
-    # Let's try 3x3 cells of 341x341.
-
-    rows = 3
-    cols = 3
-    cell_w = 1024 // cols
-    cell_h = 1024 // rows
+    with span("mask"):
+        cleared = clear(pixels, color_key_mask(pixels, bg_color, threshold, inclusive=False), fill=(255, 255, 255, 0)) # Transparent
+    count("pixels_cleared", cleared)
+    img = to_image(pixels)
+
+    # Icons sit on a grid; find it from the alpha projections, else assume
+    # the 3x3 layout the generated sheet was made with.
+    with span("grid"):
+        grid = detect_or_uniform(img, 3, 3, background="alpha")
 
     icons = []
 
-    for r in range(rows):
-        for c in range(cols):
-            x = c * cell_w
-            y = r * cell_h
+    with span("crop", cells=len(grid.frames)):
+        for frame in grid.frames:
             # Crop cell
-            cell = img.crop((x, y, x + cell_w, y + cell_h))
+            cell = img.crop(frame.box)
             bbox = cell.getbbox()
             if bbox:
                 # Found something in this cell
@@ -57,7 +44,8 @@ def process_ui():
                 if (bbox[2] - bbox[0]) > 10 and (bbox[3] - bbox[1]) > 10:
                     icon = cell.crop(bbox)
                     icons.append(icon)
-                    print(f"Found icon at {r},{c} size {icon.size}")
+                    print(f"Found icon at {frame.row},{frame.col} size {icon.size}")
+    count("components", len(icons))
 
     print(f"Found {len(icons)} icons via grid search.")
 
@@ -81,8 +69,9 @@ def process_ui():
 
              strip.paste(icon_resized, (target_x, target_y))
 
-        strip.save(OUTPUT_PATH)
-        print(f"Saved strip to {OUTPUT_PATH}")
+        with span("save", path=str(output_path)):
+            save_png(strip, output_path)
+        print(f"Saved strip to {output_path}")
 
 if __name__ == "__main__":
     process_ui()
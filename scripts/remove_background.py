@@ -1,39 +1,42 @@
+import argparse
+
 from PIL import Image
-import sys
-import os
 
-def remove_background(image_path, output_path, tolerance=30):
-    try:
-        img = Image.open(image_path).convert("RGBA")
-        datas = img.getdata()
-        
-        width, height = img.size
-        # Process image in 40x40 chunks
-        grid_size = 40
-        pixels = img.load()
-        
-        for frame_idx in range(width // grid_size):
-            offset_x = frame_idx * grid_size
-            bg_color = pixels[offset_x, 0] # Top-left of the frame
-            print(f"Frame {frame_idx} bg detected: {bg_color}")
-            
-            for y in range(height): # Assumes 1 row or handle height
-                for x in range(offset_x, offset_x + grid_size):
-                    if x >= width: break
-                    r, g, b, a = pixels[x, y]
-                    if (abs(r - bg_color[0]) <= tolerance and
-                        abs(g - bg_color[1]) <= tolerance and
-                        abs(b - bg_color[2]) <= tolerance):
-                        pixels[x, y] = (0, 0, 0, 0)
-        
-        img.save(output_path, "PNG")
-        print(f"Saved transparent image to {output_path}")
-        
-    except Exception as e:
-        print(f"Error: {e}")
+from bg_remove import border_connected, clear, frame_corner_colors, per_frame_key_mask, rgba_array, to_image
+from grid_detect import detect_or_uniform
+from pipeline_trace import count, span
+from png_optimize import save_png
+
+def remove_background(image_path, output_path, tolerance=30, edge_only=False):
+    with span("load", path=str(image_path)):
+        img = Image.open(image_path)
+        pixels = rgba_array(img)
+    count("pixels", img.width * img.height)
+
+    # Process image frame by frame, each keyed on its own top-left pixel. The
+    # frame width comes from the sheet's grid; the strips are 40px when unsure.
+    with span("grid"):
+        grid = detect_or_uniform(img, max(1, img.width // 40), 1, tolerance=tolerance)
+    grid_size = grid.cell_size[0] if grid.rows == 1 and grid.cell_size else 40
+    for frame_idx, bg_color in enumerate(frame_corner_colors(pixels, grid_size)[0]):
+        print(f"Frame {frame_idx} bg detected: {tuple(int(c) for c in bg_color)}")
+
+    with span("mask", edge_only=edge_only):
+        mask = per_frame_key_mask(pixels, grid_size, tolerance=tolerance)
+        if edge_only:
+            # Only key out background reachable from the frame edge; same-coloured
+            # pixels enclosed by the sprite are kept.
+            mask = border_connected(mask, grid_size)
+        count("pixels_cleared", clear(pixels, mask))
+    with span("save", path=str(output_path)):
+        save_png(to_image(pixels), output_path)
+    print(f"Saved transparent image to {output_path}")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python remove_background.py <input_path> <output_path>")
-    else:
-        remove_background(sys.argv[1], sys.argv[2])
+    parser = argparse.ArgumentParser(description="Key out each frame's corner colour.")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--tolerance", type=int, default=30)
+    parser.add_argument("--edge-only", action="store_true", help="only remove background connected to the frame border")
+    args = parser.parse_args()
+    remove_background(args.input_path, args.output_path, args.tolerance, args.edge_only)
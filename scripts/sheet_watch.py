@@ -0,0 +1,171 @@
+"""Watch mode for extract_canon_sprites: re-extract only the regions an edit touched.
+
+    python scripts/extract_canon_sprites.py --watch
+
+After the normal incremental pass the decoded sheet stays in memory. The
+sheet file is polled (mtime and size, every POLL_SECONDS); when it changes
+it is decoded again and compared with the previous pixels as one uint32
+array, the changed pixels are OR-reduced into TILE x TILE tiles, and the
+connected groups of changed tiles become the dirty rectangles. Only the
+RegionSpecs intersecting one of them are re-extracted, and the manifest and
+incremental cache are updated as a full run would, so a later run without
+--watch finds everything clean. A resized sheet rebuilds every region.
+
+A save that cannot be extracted (say, a row cleared mid-edit) is reported
+and skipped: the manifest and cache keep their previous entries, and the
+next change is diffed against the last sheet that extracted cleanly, so the
+failed regions are retried with it.
+
+Needs numpy; Ctrl+C stops it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from PIL import Image
+
+from decode_cache import MappedSheet
+from extract_canon_sprites import (
+    CACHE,
+    MANIFEST,
+    ROOT,
+    SPECS,
+    ExtractOptions,
+    RegionSpec,
+    connected_components_np,
+    file_digest,
+    load_json,
+    region_digest,
+    run_parallel,
+    write_if_changed,
+    write_manifest,
+    write_region,
+)
+from pipeline_trace import count, span
+
+
+POLL_SECONDS = 0.2
+# Changed pixels are grouped per tile before labeling; small enough that a
+# brush stroke between two regions does not reach either of them.
+TILE = 16
+
+Rect = tuple[int, int, int, int]  # (x1, y1, x2, y2), exclusive end
+
+# What a half-finished edit can make extraction raise.
+REBUILD_ERRORS = (RuntimeError, OSError, ValueError, Image.DecompressionBombError)
+
+
+def load_pixels(path: Path) -> np.ndarray | None:
+    """The sheet as an (h, w, 4) uint8 array, or None while it is only partly written."""
+    try:
+        with Image.open(path) as img:
+            return np.asarray(img.convert("RGBA"))
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def changed_rects(old: np.ndarray, new: np.ndarray, tile: int = TILE) -> list[Rect]:
+    """Bounding boxes (tile-aligned, clipped to the sheet) of the pixels that differ."""
+    h, w = new.shape[:2]
+    if old.shape != new.shape:
+        return [(0, 0, w, h)]
+    diff = np.ascontiguousarray(old).view(np.uint32)[..., 0] != np.ascontiguousarray(new).view(np.uint32)[..., 0]
+    th, tw = -(-h // tile), -(-w // tile)
+    padded = np.zeros((th * tile, tw * tile), dtype=bool)
+    padded[:h, :w] = diff
+    tiles = padded.reshape(th, tile, tw, tile).any(axis=(1, 3))
+    return [
+        (minx * tile, miny * tile, min(w, (maxx + 1) * tile), min(h, (maxy + 1) * tile))
+        for _, minx, miny, maxx, maxy in connected_components_np(tiles)
+    ]
+
+
+def touched(specs: Iterable[RegionSpec], rects: list[Rect]) -> list[RegionSpec]:
+    return [
+        spec
+        for spec in specs
+        if any(spec.x1 < x2 and x1 < spec.x2 and spec.y1 < y2 and y1 < spec.y2 for x1, y1, x2, y2 in rects)
+    ]
+
+
+def rebuild(pixels: np.ndarray, dirty: list[RegionSpec], engine: str, jobs: int, options: ExtractOptions) -> None:
+    """Re-extract `dirty` from `pixels` and record them in the manifest and cache.
+
+    The regions written before a failure are recorded too, so strips on disk
+    never disagree with the manifest and cache; the failure is then re-raised.
+    """
+    sheet = MappedSheet(pixels)
+    fresh: dict[str, dict] = {}
+    try:
+        if jobs > 1 and len(dirty) > 1:
+            run_parallel(Image.fromarray(pixels), dirty, engine, jobs, options, into=fresh)
+        else:
+            for spec in dirty:
+                fresh[spec.key] = write_region(sheet, spec, engine, options)
+    finally:
+        if fresh:
+            record(sheet, fresh, options)
+
+
+def record(sheet: MappedSheet, fresh: dict[str, dict], options: ExtractOptions) -> None:
+    """Merge the regions in `fresh` into the manifest and cache; specs never extracted stay out."""
+    previous = load_json(MANIFEST)
+    manifest = {spec.key: entry for spec in SPECS if (entry := fresh.get(spec.key) or previous.get(spec.key))}
+    cache = load_json(CACHE)
+    for spec in SPECS:
+        if spec.key in fresh:
+            cache[spec.key] = {
+                "input": region_digest(sheet, spec, options),
+                "output": file_digest(ROOT / fresh[spec.key]["output"]),
+            }
+    write_manifest(manifest)
+    write_if_changed(CACHE, json.dumps(cache, indent=2))
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def watch(path: Path, pixels: np.ndarray, engine: str, jobs: int, options: ExtractOptions) -> None:
+    """Poll `path` and re-extract the regions each change touches; `pixels` is the sheet as last extracted."""
+    print(f"watching {path} (Ctrl+C to stop)")
+    seen = _signature(path)
+    try:
+        while True:
+            time.sleep(POLL_SECONDS)
+            current = _signature(path)
+            if current is None or current == seen:
+                continue
+            start = time.perf_counter()
+            with span("watch", path=str(path)):
+                fresh = load_pixels(path)
+                if fresh is None:
+                    continue  # still being written; retried on the next poll
+                seen = current
+                with span("diff"):
+                    rects = changed_rects(pixels, fresh)
+                count("dirty_rects", len(rects))
+                dirty = touched(SPECS, rects)
+                with span("extract", regions=len(dirty), jobs=jobs):
+                    try:
+                        if dirty:
+                            rebuild(fresh, dirty, engine, jobs, options)
+                    except REBUILD_ERRORS as e:
+                        print(f"rebuild failed, failed regions keep their previous outputs until the next change: {e}")
+                        continue
+                pixels = fresh
+            print(
+                f"{len(rects)} changed area(s), {len(dirty)} region(s) rebuilt "
+                f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+    except KeyboardInterrupt:
+        print("stopped watching")
@@ -1,33 +1,48 @@
+import sys
+from pathlib import Path
+
 from PIL import Image
-import os
 
-source_path = r"c:\Users\mirtg\.gemini\antigravity\brain\6899a526-21a2-45d5-a70d-9fddfc100f22\flan_bebe_1771215172347.png"
-output_dir = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\sprites\flan_bebe"
+from grid_detect import detect_grid, uniform_grid
+from pipeline_trace import count, span
+from png_optimize import save_png
+
+ROOT = Path(__file__).resolve().parents[1]
+# The generated 640x640 flan_bebe sheet (4x4 grid of 160px frames).
+SOURCE = ROOT / "apps/web/public/assets/flan_bebe_v2.png"
+OUTPUT_DIR = ROOT / "apps/web/public/assets/sprites/flan_bebe"
+ROWS = 4
+COLS = 4
+
+
+def output_paths(output_dir=OUTPUT_DIR):
+    return [output_dir / f"flan_bebe_r{row}_c{col}.png" for row in range(ROWS) for col in range(COLS)]
 
-os.makedirs(output_dir, exist_ok=True)
 
-try:
+def slice_sheet(source_path=SOURCE, output_dir=OUTPUT_DIR):
+    output_dir.mkdir(parents=True, exist_ok=True)
     with Image.open(source_path) as img:
+        with span("load", path=str(source_path)):
+            img.load()
         width, height = img.size
-        # Assuming 4x4 grid based on 640x640 size (160x160 per frame)
-        rows = 4
-        cols = 4
-        framew = width // cols
-        frameh = height // rows
-
-        print(f"Slicing {width}x{height} image into {rows} rows and {cols} columns ({framew}x{frameh} px).")
-
-        for row in range(rows):
-            for col in range(cols):
-                left = col * framew
-                upper = row * frameh
-                right = left + framew
-                lower = upper + frameh
-
-                crop = img.crop((left, upper, right, lower))
-                filename = f"flan_bebe_r{row}_c{col}.png"
-                crop.save(os.path.join(output_dir, filename))
-                print(f"Saved {filename}")
-
-except Exception as e:
-    print(f"Error: {e}")
+        count("pixels", width * height)
+        # The output names are fixed at ROWS x COLS, so a detected grid only
+        # moves the cut lines; any other layout is cut evenly as before.
+        with span("grid"):
+            grid = detect_grid(img)
+            if (grid.method, grid.cols, grid.rows) != ("grid", COLS, ROWS):
+                grid = uniform_grid(width, height, COLS, ROWS)
+
+        print(f"Slicing {width}x{height} image into {ROWS} rows and {COLS} columns ({'detected' if grid.method == 'grid' else 'even'} cuts).")
+
+        for frame in grid.frames:
+            with span("crop", row=frame.row, col=frame.col):
+                crop = img.crop(frame.box)
+            filename = f"flan_bebe_r{frame.row}_c{frame.col}.png"
+            with span("save", path=filename):
+                save_png(crop, output_dir / filename)
+            print(f"Saved {filename}")
+
+
+if __name__ == "__main__":
+    slice_sheet(Path(sys.argv[1]) if len(sys.argv) > 1 else SOURCE)
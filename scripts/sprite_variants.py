@@ -0,0 +1,100 @@
+"""0.5x and 2x copies of every strip and atlas page, plus the manifest the app picks from.
+
+    python scripts/sprite_variants.py
+
+For each canon strip (and atlas page, when an atlas has been built) this
+writes <stem>@2x<suffix> (exact nearest-neighbour doubling) and
+<stem>@0.5x<suffix> (pixel_scale.downscale, so no new colours) next to it,
+and records them in apps/web/src/game/renderer/spriteVariants.json keyed by
+the 1x public path. spriteVariants.ts picks the smallest variant whose
+cells still cover the on-screen size, so a sprite drawn at 40px decodes and
+keeps a 64px-cell texture instead of a 128px one.
+
+A variant is regenerated only when its 1x source is newer. Downscaled
+copies are only made where frames sit on a grid the scale maps to whole
+pixels: padded strips (128px cells) and atlas pages (slots aligned to
+build_atlas.ALIGN). Trimmed strips pack frames at arbitrary offsets with
+no gap, so they only get the exact 2x copy.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+from build_atlas import ALIGN, PUBLIC
+from build_atlas import OUT_DIR as ATLAS_DIR
+from extract_canon_sprites import MANIFEST, OUT_ROOT, ROOT, SPECS, load_json, write_if_changed
+from pixel_scale import downscale
+from png_optimize import save_png
+
+
+VARIANTS_PATH = ROOT / "apps/web/src/game/renderer/spriteVariants.json"
+SCALES = (0.5, 2)
+
+
+def variant_path(path: Path, scale: float) -> Path:
+    return path.with_name(f"{path.stem}@{scale:g}x{path.suffix}")
+
+
+def scaled(img: Image.Image, scale: float) -> Image.Image:
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    if scale >= 1:
+        return img.resize(size, Image.Resampling.NEAREST)
+    return downscale(img, size)
+
+
+def write_variants(path: Path, scales: tuple[float, ...] = SCALES) -> list[dict]:
+    """Variants of `path` (writing stale ones), 1x included, smallest scale first."""
+    with Image.open(path) as img:
+        width, height = img.size
+        out = [{"scale": 1, "src": path.relative_to(PUBLIC).as_posix(), "width": width, "height": height}]
+        for scale in scales:
+            target = variant_path(path, scale)
+            if not target.exists() or target.stat().st_mtime < path.stat().st_mtime:
+                if not save_png(scaled(img.convert("RGBA"), scale), target):
+                    target.touch()  # same pixels; just mark it current
+            with Image.open(target) as small:
+                size = small.size
+            out.append({"scale": scale, "src": target.relative_to(PUBLIC).as_posix(), "width": size[0], "height": size[1]})
+    for scale in set(SCALES) - set(scales):
+        variant_path(path, scale).unlink(missing_ok=True)  # e.g. a 0.5x left from before --trim
+    return sorted(out, key=lambda v: v["scale"])
+
+
+def sources(manifest_path: Path = MANIFEST, atlas_dir: Path = ATLAS_DIR) -> dict[Path, tuple[float, ...]]:
+    """Image -> the scales it can be resized to without frames bleeding into each other."""
+    out: dict[Path, tuple[float, ...]] = {}
+    manifest = load_json(manifest_path)
+    if manifest:
+        for entry in manifest.values():
+            if entry.get("trimmed"):
+                scales = tuple(s for s in SCALES if s >= 1)
+            else:
+                scales = tuple(s for s in SCALES if float(entry["frame_size"] * s).is_integer())
+            out[ROOT / entry["output"]] = scales
+    else:
+        out.update((OUT_ROOT / spec.folder / spec.filename, SCALES) for spec in SPECS)
+    frame_map = load_json(atlas_dir / "atlas.json")
+    for page in frame_map.get("atlases", []):
+        out[PUBLIC / page["src"]] = tuple(s for s in SCALES if s >= 1 or float(ALIGN * s).is_integer())
+    return {path: scales for path, scales in out.items() if path.exists()}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write 0.5x/2x sprite variants and their manifest.")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="canon_extract_manifest.json")
+    args = parser.parse_args(argv)
+
+    variants = {p.relative_to(PUBLIC).as_posix(): write_variants(p, scales) for p, scales in sources(args.manifest).items()}
+    if write_if_changed(VARIANTS_PATH, json.dumps(variants, indent=2, sort_keys=True) + "\n"):
+        print(f"variant manifest: {VARIANTS_PATH}")
+    print(f"{len(variants)} image(s), {sum(len(v) for v in variants.values())} variant(s) including 1x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
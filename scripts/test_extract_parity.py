@@ -0,0 +1,24 @@
+"""The numpy extract engine must label and cut exactly like the pure-Python one.
+
+    python -m pytest scripts/test_extract_parity.py
+"""
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from check_extract_parity import check_manifest, random_masks  # noqa: E402
+from extract_canon_sprites import SOURCE, connected_components, connected_components_np  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_labeling_matches_python(seed: int) -> None:
+    for i, mask in enumerate(random_masks(50, seed)):
+        expected = connected_components(mask)
+        assert connected_components_np(np.array(mask, dtype=bool)) == expected, f"mask #{i}"
+
+
+@pytest.mark.skipif(not SOURCE.exists(), reason=f"master sheet not in the checkout: {SOURCE}")
+def test_manifest_matches_python() -> None:
+    assert check_manifest(SOURCE) == 0
@@ -0,0 +1,238 @@
+"""Check every sprite's dimensions from its file header alone, before a deploy.
+
+    python scripts/validate_assets.py
+    python scripts/validate_assets.py --verbose    # list every checked image
+
+Only the first bytes of each file are read: the PNG signature and IHDR
+chunk (or, for the JPEG data that hides in some .png files, the markers up
+to the first SOF), so no pixel data is ever inflated and the whole public
+tree takes a few milliseconds. Checked:
+
+* every image under apps/web/public has a readable header (JPEG data in a
+  .png file is reported but does not fail the run);
+* each canon strip in canon_extract_manifest.json (when the extractor has
+  run) is frame_size * frames wide and frame_size tall, or for trimmed
+  strips exactly covers its frame_rects;
+* each SPRITE_CONFIGS entry in SpriteConfigs.ts is gridSize * frames wide
+  and a whole number of gridSize rows tall, at the path the app actually
+  loads (its hashed copy when hashedAssets.json maps one); strips listed in
+  trimmedFrames.json (extract_canon_sprites.py --trim) must instead exactly
+  cover their frame rects. An entry written in a shape the parser does not
+  read fails the run rather than going unchecked;
+* each variant listed in spriteVariants.json has the size recorded there.
+
+Exits 1 on any mismatch. Standard library only, so CI can run it without
+installing Pillow.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# Same locations as extract_canon_sprites / build_atlas, which need Pillow to import.
+ROOT = Path(__file__).resolve().parents[1]
+PUBLIC = ROOT / "apps/web/public"
+MANIFEST = PUBLIC / "assets/sprites/canon_extract_manifest.json"
+RENDERER = ROOT / "apps/web/src/game/renderer"
+SPRITE_CONFIGS = RENDERER / "SpriteConfigs.ts"
+HASHED_MAP = RENDERER / "hashedAssets.json"
+TRIMMED = RENDERER / "trimmedFrames.json"
+VARIANTS = RENDERER / "spriteVariants.json"
+
+EXTENSIONS = (".png", ".jpg", ".jpeg")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_MODES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+JPEG_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+# Start-of-frame markers; C4 (DHT), C8 (JPG) and CC (DAC) share the range but are not frames.
+JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+CONFIG_ENTRY = re.compile(
+    r"^\s*(\w+): \{ src: asset\('(\w+)', '([^']+)'\), gridSize: (\d+), "
+    r"animations: (?:multiRow|singleRow)Animations\((\d+)\) \}",
+    re.MULTILINE,
+)
+# Any entry at all, however it is written; CONFIG_ENTRY must parse every one of them.
+CONFIG_KEY = re.compile(r"^\s*(\w+): \{ src: asset\(", re.MULTILINE)
+
+
+class HeaderError(ValueError):
+    pass
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    format: str
+    width: int
+    height: int
+    mode: str
+
+
+@dataclass(frozen=True)
+class Expectation:
+    """What one file must measure; `height` None means any whole number of `grid` rows."""
+
+    source: str
+    key: str
+    path: Path
+    width: int
+    height: int | None
+    grid: int | None = None
+
+    def problem(self, header: ImageHeader) -> str | None:
+        if header.width != self.width:
+            return f"width {header.width}, expected {self.width}"
+        if self.height is not None and header.height != self.height:
+            return f"height {header.height}, expected {self.height}"
+        if self.grid and (header.height == 0 or header.height % self.grid):
+            return f"height {header.height} is not a multiple of gridSize {self.grid}"
+        return None
+
+
+def _jpeg_header(fh) -> ImageHeader:
+    fh.seek(2)
+    while True:
+        marker = fh.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise HeaderError("JPEG ends before its frame header")
+        kind = marker[1]
+        if kind == 0xFF:  # fill byte
+            fh.seek(-1, 1)
+            continue
+        if kind in (0x01, *range(0xD0, 0xD8)):  # markers without a length
+            continue
+        (length,) = struct.unpack(">H", fh.read(2))
+        if kind in JPEG_SOF:
+            _, height, width, components = struct.unpack(">BHHB", fh.read(6))
+            return ImageHeader("JPEG", width, height, JPEG_MODES.get(components, "?"))
+        fh.seek(length - 2, 1)
+
+
+def read_header(path: Path) -> ImageHeader:
+    """Format, size and mode of a PNG or JPEG, from its header bytes only."""
+    with open(path, "rb") as fh:
+        head = fh.read(26)
+        if head.startswith(PNG_SIGNATURE):
+            if head[12:16] != b"IHDR":
+                raise HeaderError("PNG does not start with IHDR")
+            width, height, _, color_type = struct.unpack(">IIBB", head[16:26])
+            return ImageHeader("PNG", width, height, PNG_MODES.get(color_type, "?"))
+        if head.startswith(b"\xff\xd8"):
+            return _jpeg_header(fh)
+    raise HeaderError("neither PNG nor JPEG")
+
+
+def load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def canon_expectations(manifest_path: Path = MANIFEST) -> list[Expectation]:
+    out = []
+    for key, entry in load_json(manifest_path).items():
+        path = ROOT / entry["output"]
+        if entry.get("trimmed"):
+            rects = [r["rect"] for r in entry["frame_rects"]]
+            width, height = max(x + w for x, _, w, _ in rects), max(h for _, _, _, h in rects)
+        else:
+            width, height = entry["frame_size"] * entry["frames"], entry["frame_size"]
+        out.append(Expectation("manifest", key, path, width, height))
+    return out
+
+
+def config_expectations(
+    configs_path: Path = SPRITE_CONFIGS, hashed_path: Path = HASHED_MAP, trimmed_path: Path = TRIMMED
+) -> list[Expectation]:
+    """Raises ConfigError when an entry is written in a shape CONFIG_ENTRY does not parse."""
+    hashed = load_json(hashed_path)
+    trimmed = load_json(trimmed_path)
+    text = configs_path.read_text(encoding="utf-8")
+    entries = CONFIG_ENTRY.findall(text)
+    parsed = {name for name, *_ in entries}
+    unparsed = [name for name in CONFIG_KEY.findall(text) if name not in parsed]
+    if not entries or unparsed:
+        raise ConfigError(
+            f"{configs_path.relative_to(ROOT).as_posix()}: {len(entries)} entries parsed, "
+            f"could not parse: {', '.join(unparsed) or 'any entry'}"
+        )
+    out = []
+    for name, key, src, grid, frames in entries:
+        path = PUBLIC / hashed.get(key, src)
+        if name in trimmed:
+            rects = trimmed[name]
+            width, height = max(r["x"] + r["w"] for r in rects), max(r["y"] + r["h"] for r in rects)
+            out.append(Expectation("SPRITE_CONFIGS", name, path, width, height))
+        else:
+            out.append(Expectation("SPRITE_CONFIGS", name, path, int(grid) * int(frames), None, int(grid)))
+    return out
+
+
+def variant_expectations(variants_path: Path = VARIANTS) -> list[Expectation]:
+    return [
+        Expectation("spriteVariants", f"{base} {v['scale']:g}x", PUBLIC / v["src"], v["width"], v["height"])
+        for base, variants in load_json(variants_path).items()
+        for v in variants
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate sprite dimensions from file headers only.")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST, help="canon_extract_manifest.json")
+    parser.add_argument("--verbose", action="store_true", help="print every image and its header")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    headers: dict[Path, ImageHeader] = {}
+    errors: list[str] = []
+    warnings: list[str] = []
+    for path in sorted(p for p in PUBLIC.rglob("*") if p.suffix.lower() in EXTENSIONS and p.is_file()):
+        rel = path.relative_to(ROOT).as_posix()
+        try:
+            header = headers[path] = read_header(path)
+        except (HeaderError, OSError, struct.error) as e:
+            errors.append(f"{rel}: unreadable header ({e})")
+            continue
+        if header.format == "JPEG" and path.suffix.lower() == ".png":
+            warnings.append(f"{rel}: JPEG data in a .png file")
+        if args.verbose:
+            print(f"{rel}: {header.format} {header.width}x{header.height} {header.mode}")
+
+    try:
+        configs = config_expectations()
+    except ConfigError as e:
+        errors.append(str(e))
+        configs = []
+    expectations = canon_expectations(args.manifest) + configs + variant_expectations()
+    for exp in expectations:
+        header = headers.get(exp.path)
+        if header is None:
+            if not exp.path.exists():
+                errors.append(f"{exp.source} {exp.key}: missing {exp.path.relative_to(ROOT).as_posix()}")
+            continue
+        problem = exp.problem(header)
+        if problem:
+            errors.append(f"{exp.source} {exp.key}: {exp.path.relative_to(ROOT).as_posix()} {problem}")
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for line in warnings:
+        print(f"warning: {line}")
+    for line in errors:
+        print(f"error: {line}")
+    print(f"{len(headers)} image(s), {len(expectations)} size check(s), {len(errors)} error(s) in {elapsed:.1f} ms")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
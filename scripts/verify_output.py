@@ -1,12 +1,14 @@
-from PIL import Image
-import os
+from pathlib import Path
 
-path = r"c:\Users\mirtg\OneDrive\Escritorio\Cristobalini\code related\Tamagotchi\apps\web\public\assets\sprites_pompom.png"
+from validate_assets import read_header
 
-if os.path.exists(path):
-    img = Image.open(path)
-    print(f"Generated Sprite Sheet: {img.size}")
-    if img.size == (192, 336):
+path = Path(__file__).resolve().parents[1] / "apps/web/public/assets/sprites_pompom.png"
+
+if path.exists():
+    header = read_header(path)  # IHDR only; the pixels are never decoded
+    size = (header.width, header.height)
+    print(f"Generated Sprite Sheet: {size}")
+    if size == (192, 336):
         print("Dimensions CORRECT.")
     else:
         print(f"Dimensions INCORRECT (Expected 192x336).")